@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+BlockBank - Signature Backend Benchmark
+Compares keypair generation, signing and verification across the ECDSA
+backends in crypto_utils, and checks they accept each other's keys and
+signatures.
+
+Usage: python3 benchmark_crypto.py [iterations]
+"""
+
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, '/app/backend')
+from crypto_utils import CRYPTO_BACKENDS
+
+MESSAGE = b"a" * 64  # transaction hashes are 64 hex characters
+
+
+def timed(fn, iterations: int) -> float:
+    """Operations per second for fn over the given number of iterations"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def bench(backend, iterations: int) -> dict:
+    public_key, private_key = backend.generate_keypair()
+    private_bytes = bytes.fromhex(private_key)
+    public_bytes = bytes.fromhex(public_key)
+    signature = backend.sign(MESSAGE, private_bytes)
+    parsed = backend.load_public_key(public_bytes)
+
+    return {
+        "keygen": timed(backend.generate_keypair, iterations),
+        "sign": timed(lambda: backend.sign(MESSAGE, private_bytes), iterations),
+        "verify": timed(lambda: backend.verify(backend.load_public_key(public_bytes), signature, MESSAGE), iterations),
+        "verify (cached key)": timed(lambda: backend.verify(parsed, signature, MESSAGE), iterations),
+    }
+
+
+def check_compatibility(backends: dict) -> bool:
+    """Every backend must verify every other backend's signatures"""
+    ok = True
+    for signer_name, signer in backends.items():
+        public_key, private_key = signer.generate_keypair()
+        signature = signer.sign(MESSAGE, bytes.fromhex(private_key))
+        for verifier_name, verifier in backends.items():
+            parsed = verifier.load_public_key(bytes.fromhex(public_key))
+            if not verifier.verify(parsed, signature, MESSAGE):
+                print(f"❌ {verifier_name} rejected a {signer_name} signature")
+                ok = False
+    return ok
+
+
+def main():
+    """Main entry point"""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    backends = {name: cls() for name, cls in CRYPTO_BACKENDS.items()}
+
+    print(f"🔐 secp256k1 benchmark, {iterations} iterations per operation\n")
+
+    results = {}
+    for name, backend in backends.items():
+        print(f"⏱️  {name}...")
+        results[name] = bench(backend, iterations)
+
+    print()
+    operations = list(next(iter(results.values())))
+    print(f"{'operation':<22}" + "".join(f"{name + ' ops/s':>18}" for name in results))
+    for op in operations:
+        print(f"{op:<22}" + "".join(f"{results[name][op]:>18,.0f}" for name in results))
+
+    if "ecdsa" in results and len(results) > 1:
+        print()
+        for name in results:
+            if name == "ecdsa":
+                continue
+            for op in operations:
+                print(f"📈 {name} {op}: {results[name][op] / results['ecdsa'][op]:.1f}x ecdsa")
+
+    print()
+    if check_compatibility(backends):
+        print("✅ All backends accept each other's keys and signatures")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,66 +2,224 @@ import hashlib
 import ecdsa
 import secrets
 from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
 from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Random import get_random_bytes
 import base64
+import functools
 from typing import Tuple
 import json
+import logging
+import os
+
+from cache_utils import LRUCache
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.utils import (
+        decode_dss_signature, encode_dss_signature
+    )
+except ImportError:
+    ec = None
+
+logger = logging.getLogger(__name__)
+
+# secp256k1 scalar/coordinate size: signatures are r||s, public keys X||Y
+SECP256K1_SIZE = 32
+
+
+class EcdsaBackend:
+    """secp256k1 on the pure-Python ecdsa package (SHA-1 digest, raw r||s signatures)"""
+
+    name = "ecdsa"
+
+    def generate_keypair(self) -> Tuple[str, str]:
+        signing_key = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
+        verifying_key = signing_key.get_verifying_key()
+        return verifying_key.to_string().hex(), signing_key.to_string().hex()
+
+    def sign(self, message: bytes, private_key: bytes) -> bytes:
+        signing_key = ecdsa.SigningKey.from_string(private_key, curve=ecdsa.SECP256k1)
+        return signing_key.sign(message)
+
+    def load_public_key(self, public_key: bytes):
+        return ecdsa.VerifyingKey.from_string(public_key, curve=ecdsa.SECP256k1)
+
+    def verify(self, public_key, signature: bytes, message: bytes) -> bool:
+        try:
+            return public_key.verify(signature, message)
+        except ecdsa.BadSignatureError:
+            return False
+
+
+class OpenSSLBackend:
+    """secp256k1 on OpenSSL via the cryptography package.
+
+    Byte-for-byte compatible with EcdsaBackend: 32-byte private keys,
+    64-byte X||Y public keys, SHA-1 digests and 64-byte r||s signatures
+    (converted to and from the DER encoding OpenSSL uses).
+    """
+
+    name = "openssl"
+
+    def generate_keypair(self) -> Tuple[str, str]:
+        private_key = ec.generate_private_key(ec.SECP256K1())
+        numbers = private_key.public_key().public_numbers()
+        public_key = numbers.x.to_bytes(SECP256K1_SIZE, "big") + numbers.y.to_bytes(SECP256K1_SIZE, "big")
+        private_value = private_key.private_numbers().private_value.to_bytes(SECP256K1_SIZE, "big")
+        return public_key.hex(), private_value.hex()
+
+    def sign(self, message: bytes, private_key: bytes) -> bytes:
+        if len(private_key) != SECP256K1_SIZE:
+            raise ValueError("Invalid private key length")
+        key = ec.derive_private_key(int.from_bytes(private_key, "big"), ec.SECP256K1())
+        r, s = decode_dss_signature(key.sign(message, ec.ECDSA(hashes.SHA1())))
+        return r.to_bytes(SECP256K1_SIZE, "big") + s.to_bytes(SECP256K1_SIZE, "big")
+
+    def load_public_key(self, public_key: bytes):
+        if len(public_key) == 2 * SECP256K1_SIZE:
+            public_key = b"\x04" + public_key
+        return ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256K1(), public_key)
+
+    def verify(self, public_key, signature: bytes, message: bytes) -> bool:
+        if len(signature) != 2 * SECP256K1_SIZE:
+            return False
+        r = int.from_bytes(signature[:SECP256K1_SIZE], "big")
+        s = int.from_bytes(signature[SECP256K1_SIZE:], "big")
+        try:
+            public_key.verify(encode_dss_signature(r, s), message, ec.ECDSA(hashes.SHA1()))
+            return True
+        except InvalidSignature:
+            return False
+
+
+CRYPTO_BACKENDS = {"ecdsa": EcdsaBackend}
+if ec is not None:
+    CRYPTO_BACKENDS["openssl"] = OpenSSLBackend
+
+
+def load_backend(name: str = None):
+    """Signature backend named by CRYPTO_BACKEND: openssl (default) or ecdsa"""
+    name = (name or os.environ.get('CRYPTO_BACKEND', 'openssl')).lower()
+    if name not in CRYPTO_BACKENDS:
+        logger.warning("Crypto backend %r unavailable, falling back to ecdsa", name)
+        name = "ecdsa"
+    return CRYPTO_BACKENDS[name]()
+
+
+backend = load_backend()
+
+# Parsed verifying keys by public key hex (the wallet address)
+_verifying_keys = LRUCache(maxsize=int(os.environ.get('VERIFYING_KEY_CACHE_SIZE', '4096')))
+
+# (message, signature, public key) -> verification result
+_verified_signatures = LRUCache(maxsize=int(os.environ.get('SIGNATURE_CACHE_SIZE', '65536')))
 
 
 def generate_keypair() -> Tuple[str, str]:
     """Generate ECDSA keypair (secp256k1)"""
-    signing_key = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
-    verifying_key = signing_key.get_verifying_key()
-    
-    private_key = signing_key.to_string().hex()
-    public_key = verifying_key.to_string().hex()
-    
-    return public_key, private_key
+    return backend.generate_keypair()
 
 
 def sign_message(message: str, private_key_hex: str) -> str:
     """Sign a message with ECDSA private key"""
     private_key_bytes = bytes.fromhex(private_key_hex)
-    signing_key = ecdsa.SigningKey.from_string(private_key_bytes, curve=ecdsa.SECP256k1)
-    
-    signature = signing_key.sign(message.encode())
+    signature = backend.sign(message.encode(), private_key_bytes)
     return signature.hex()
 
 
+def sign_message_with_key(message: str, private_key: bytes) -> str:
+    """Sign a message with a raw 32-byte private key"""
+    return backend.sign(message.encode(), bytes(private_key)).hex()
+
+
+def get_verifying_key(public_key_hex: str):
+    """Parse a public key, reusing the parsed key for repeat wallet addresses"""
+    verifying_key = _verifying_keys.get(public_key_hex)
+    if verifying_key is None:
+        public_key_bytes = bytes.fromhex(public_key_hex)
+        verifying_key = backend.load_public_key(public_key_bytes)
+        _verifying_keys.set(public_key_hex, verifying_key)
+    return verifying_key
+
+
 def verify_signature(message: str, signature_hex: str, public_key_hex: str) -> bool:
     """Verify ECDSA signature"""
+    cache_key = (message, signature_hex, public_key_hex)
+    cached = _verified_signatures.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        public_key_bytes = bytes.fromhex(public_key_hex)
-        verifying_key = ecdsa.VerifyingKey.from_string(public_key_bytes, curve=ecdsa.SECP256k1)
-        
+        verifying_key = get_verifying_key(public_key_hex)
+
         signature_bytes = bytes.fromhex(signature_hex)
-        verifying_key.verify(signature_bytes, message.encode())
-        return True
+        valid = backend.verify(verifying_key, signature_bytes, message.encode())
     except:
-        return False
+        valid = False
+
+    _verified_signatures.set(cache_key, valid)
+    return valid
+
+
+def cached_signature_result(message: str, signature_hex: str, public_key_hex: str):
+    """Cached result of an earlier verify_signature call, or None"""
+    return _verified_signatures.get((message, signature_hex, public_key_hex), count=False)
+
+
+def signature_cache_stats() -> dict:
+    """Hit/miss counters for the verifying key and verification caches"""
+    return {
+        "backend": backend.name,
+        "verifying_keys": _verifying_keys.stats(),
+        "verified_signatures": _verified_signatures.stats()
+    }
+
+
+# Envelope format: "env1:" + base64(nonce + tag + ciphertext), encrypted
+# directly under a key-encryption key derived once per process from the
+# master key. Legacy blobs (no prefix) carry their own salt and pay a
+# PBKDF2 derivation on every decrypt.
+ENVELOPE_PREFIX = "env1:"
+KEK_SALT = b"BlockBank env1 key-encryption key"
+KEK_ITERATIONS = 200_000
+
+
+@functools.lru_cache(maxsize=4)
+def derive_key_encryption_key(master_key: str) -> bytes:
+    """AES-256 key-encryption key for the env1 format (derived once per master key)"""
+    return PBKDF2(master_key, KEK_SALT, dkLen=32, count=KEK_ITERATIONS, hmac_hash_module=SHA256)
+
+
+def is_legacy_encrypted_key(encrypted_key: str) -> bool:
+    return not encrypted_key.startswith(ENVELOPE_PREFIX)
 
 
 def encrypt_private_key(private_key: str, master_key: str) -> str:
-    """Encrypt private key with master key using AES-256"""
-    # Derive 32-byte key from master key
-    salt = get_random_bytes(16)
-    key = PBKDF2(master_key, salt, dkLen=32)
+    """Encrypt private key with master key using AES-256 (env1 format)"""
+    key = derive_key_encryption_key(master_key)
     
-    # Encrypt
     cipher = AES.new(key, AES.MODE_GCM)
     ciphertext, tag = cipher.encrypt_and_digest(private_key.encode())
     
-    # Combine salt, nonce, tag, and ciphertext
-    result = base64.b64encode(
-        salt + cipher.nonce + tag + ciphertext
-    ).decode('utf-8')
-    
-    return result
+    # Combine nonce, tag, and ciphertext
+    return ENVELOPE_PREFIX + base64.b64encode(cipher.nonce + tag + ciphertext).decode('utf-8')
 
 
 def decrypt_private_key(encrypted_key: str, master_key: str) -> str:
-    """Decrypt private key"""
+    """Decrypt private key (env1 or legacy format)"""
+    if not is_legacy_encrypted_key(encrypted_key):
+        data = base64.b64decode(encrypted_key[len(ENVELOPE_PREFIX):])
+        nonce = data[:16]
+        tag = data[16:32]
+        ciphertext = data[32:]
+        key = derive_key_encryption_key(master_key)
+        
+        cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+        return cipher.decrypt_and_verify(ciphertext, tag).decode('utf-8')
+    
     data = base64.b64decode(encrypted_key)
     
     # Extract components
@@ -86,26 +244,27 @@ def sha256_hash(data: str) -> str:
 
 
 def compute_merkle_root(tx_hashes: list) -> str:
-    """Compute merkle root from transaction hashes"""
+    """Compute merkle root from transaction hashes (version 1 scheme, see merkle.py)"""
     if not tx_hashes:
         return sha256_hash("")
     
     if len(tx_hashes) == 1:
         return tx_hashes[0]
     
-    # Make sure we have even number of hashes
-    if len(tx_hashes) % 2 != 0:
-        tx_hashes.append(tx_hashes[-1])
+    level = list(tx_hashes)
     
-    # Build merkle tree
-    while len(tx_hashes) > 1:
+    # Build merkle tree, duplicating the last hash of any odd-sized level
+    while len(level) > 1:
+        if len(level) % 2 != 0:
+            level.append(level[-1])
+        
         new_level = []
-        for i in range(0, len(tx_hashes), 2):
-            combined = tx_hashes[i] + tx_hashes[i + 1]
+        for i in range(0, len(level), 2):
+            combined = level[i] + level[i + 1]
             new_level.append(sha256_hash(combined))
-        tx_hashes = new_level
+        level = new_level
     
-    return tx_hashes[0]
+    return level[0]
 
 
 def compute_transaction_hash(sender: str, receiver: str, amount: float, timestamp: str, nonce: int) -> str:
@@ -0,0 +1,141 @@
+"""
+Database
+The process's single MongoDB client, configured from the environment.
+
+Every router, service and script takes its connection from here, so a
+worker holds one connection pool instead of one per module.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient, monitoring
+
+load_dotenv(Path(__file__).parent / '.env')
+
+# Set MONGO_URL for any shared deployment; the default is a local mongod
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'bank_blockchain_db')
+
+
+def _int_env(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def client_options() -> Dict:
+    """Pool, timeout and concern settings from MONGO_* variables; unset ones keep driver defaults"""
+    options = {
+        "maxPoolSize": _int_env('MONGO_MAX_POOL_SIZE', 100),
+        "minPoolSize": _int_env('MONGO_MIN_POOL_SIZE', 0),
+        # Fail a request that cannot get a connection instead of queueing forever
+        "waitQueueTimeoutMS": _int_env('MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000),
+        "serverSelectionTimeoutMS": _int_env('MONGO_SERVER_SELECTION_TIMEOUT_MS'),
+        "connectTimeoutMS": _int_env('MONGO_CONNECT_TIMEOUT_MS'),
+        "socketTimeoutMS": _int_env('MONGO_SOCKET_TIMEOUT_MS'),
+        "maxIdleTimeMS": _int_env('MONGO_MAX_IDLE_TIME_MS'),
+        "compressors": os.environ.get('MONGO_COMPRESSORS'),  # e.g. "zstd,snappy,zlib"
+        "w": os.environ.get('MONGO_WRITE_CONCERN'),  # e.g. "majority" or "1"
+        "readConcernLevel": os.environ.get('MONGO_READ_CONCERN'),
+        "appname": os.environ.get('MONGO_APP_NAME', 'blockbank'),
+    }
+    if options["w"] and options["w"].isdigit():
+        options["w"] = int(options["w"])
+    return {key: value for key, value in options.items() if value is not None and value != ""}
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters, summed over every server the client talks to"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            "created": 0, "closed": 0,
+            "checked_out": 0, "checked_in": 0, "checkout_failed": 0,
+            "pools_cleared": 0
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._count("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count("closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._count("checkout_failed")
+
+    def connection_checked_out(self, event):
+        self._count("checked_out")
+
+    def connection_checked_in(self, event):
+        self._count("checked_in")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+        counters["open"] = counters["created"] - counters["closed"]
+        counters["in_use"] = counters["checked_out"] - counters["checked_in"]
+        return counters
+
+
+pool_listener = PoolStats()
+
+client = AsyncIOMotorClient(MONGO_URL, event_listeners=[pool_listener], **client_options())
+db = client[DB_NAME]
+
+_sync_client: Optional[MongoClient] = None
+
+
+def get_sync_database():
+    """Blocking pymongo handle with the same settings, for synchronous scripts"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(MONGO_URL, event_listeners=[pool_listener], **client_options())
+    return _sync_client[DB_NAME]
+
+
+def pool_stats() -> Dict:
+    """Configured pool settings and live connection counters"""
+    options = client_options()
+    return {
+        "settings": {
+            key: options.get(key)
+            for key in ("maxPoolSize", "minPoolSize", "waitQueueTimeoutMS", "compressors", "w", "readConcernLevel")
+        },
+        "connections": pool_listener.snapshot()
+    }
+
+
+def close():
+    """Close the shared clients (app shutdown / end of a script)"""
+    global _sync_client
+    client.close()
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+BlockBank - Export Chain Script
+Dumps the blockchain as NDJSON, one block per line with its transactions,
+in block_number order.
+
+Usage: python3 export_chain.py [output] [--from-block N] [--gzip] [--resume]
+  output          File to write (default: stdout)
+  --from-block N  Start at block N
+  --gzip          Write a gzip-compressed file
+  --resume        Continue an uncompressed export file from its last complete block
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, '/app/backend')
+import database
+from services.chain_export import iter_export_lines
+
+
+def resume_point(path: str) -> int:
+    """Block number to continue from; drops a partial last line left by an interrupted run"""
+    last_complete = None
+    offset = 0
+    with open(path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            last_complete = line
+            offset += len(line)
+        f.truncate(offset)
+
+    if last_complete is None:
+        return 0
+    return json.loads(last_complete)["block_number"] + 1
+
+
+async def export(output, from_block: int, compress: bool) -> int:
+    """Stream the export into a binary file object; returns bytes written"""
+    written = 0
+    try:
+        async for chunk in iter_export_lines(database.db, from_block=from_block, compress=compress):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        database.close()
+    return written
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Export the blockchain as NDJSON")
+    parser.add_argument("output", nargs="?", help="output file (default: stdout)")
+    parser.add_argument("--from-block", type=int, default=0)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args()
+
+    from_block = args.from_block
+    mode = "wb"
+    if args.resume:
+        if not args.output or args.gzip:
+            print("❌ Error: --resume needs an uncompressed output file", file=sys.stderr)
+            sys.exit(1)
+        if os.path.exists(args.output):
+            from_block = max(from_block, resume_point(args.output))
+            mode = "ab"
+
+    started = time.perf_counter()
+    try:
+        if args.output:
+            with open(args.output, mode) as output:
+                written = asyncio.run(export(output, from_block, args.gzip))
+        else:
+            written = asyncio.run(export(sys.stdout.buffer, from_block, args.gzip))
+    except Exception as e:
+        print(f"❌ Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Exported from block {from_block}: {written:,} bytes in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
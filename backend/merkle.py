@@ -0,0 +1,136 @@
+import hashlib
+from typing import Dict, List, Optional
+
+
+# Version 1: the original scheme - each parent is SHA-256 over the text
+# concatenation of its children's hex digests (crypto_utils.compute_merkle_root).
+# Version 2: each parent is SHA-256 over the raw 32-byte child digests.
+LEGACY_MERKLE_VERSION = 1
+MERKLE_VERSION = 2
+
+DIGEST_SIZE = 32
+
+
+def _hash_pair_v1(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256((left.hex() + right.hex()).encode()).digest()
+
+
+def _hash_pair_v2(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(left + right).digest()
+
+
+_HASH_PAIR = {
+    LEGACY_MERKLE_VERSION: _hash_pair_v1,
+    MERKLE_VERSION: _hash_pair_v2,
+}
+
+
+class MerkleTree:
+    """Binary merkle tree over transaction hashes.
+
+    Each level is stored as one bytes object of concatenated 32-byte
+    digests, leaves first and root last. Odd-sized levels pair their last
+    node with itself; a single leaf is its own root.
+    """
+
+    def __init__(self, levels: List[bytes], version: int = MERKLE_VERSION):
+        if version not in _HASH_PAIR:
+            raise ValueError(f"Unknown merkle version {version}")
+        self.levels = levels
+        self.version = version
+
+    @classmethod
+    def from_leaves(cls, leaves: List[bytes], version: int = MERKLE_VERSION) -> "MerkleTree":
+        if not leaves:
+            return cls([b"", hashlib.sha256(b"").digest()], version)
+
+        hash_pair = _HASH_PAIR[version]
+        level = list(leaves)
+        levels = [b"".join(level)]
+
+        while len(level) > 1:
+            if len(level) % 2:
+                level.append(level[-1])
+            level = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+            levels.append(b"".join(level))
+
+        return cls(levels, version)
+
+    @classmethod
+    def from_tx_hashes(cls, tx_hashes: List[str], version: int = MERKLE_VERSION) -> "MerkleTree":
+        return cls.from_leaves([bytes.fromhex(h) for h in tx_hashes], version)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][:DIGEST_SIZE]
+
+    @property
+    def root_hex(self) -> str:
+        return self.root.hex()
+
+    @property
+    def leaf_count(self) -> int:
+        return len(self.levels[0]) // DIGEST_SIZE
+
+    def _node(self, level: int, index: int) -> bytes:
+        data = self.levels[level]
+        count = len(data) // DIGEST_SIZE
+        index = min(index, count - 1)  # odd level: the last node is its own sibling
+        return data[index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE]
+
+    def leaf_index(self, tx_hash: str) -> Optional[int]:
+        leaf = bytes.fromhex(tx_hash)
+        data = self.levels[0]
+        for index in range(self.leaf_count):
+            if data[index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE] == leaf:
+                return index
+        return None
+
+    def proof(self, index: int) -> List[Dict[str, str]]:
+        """Sibling hashes from leaf to root; O(log n) entries"""
+        if not 0 <= index < self.leaf_count:
+            raise IndexError("Leaf index out of range")
+
+        path = []
+        for level in range(len(self.levels) - 1):
+            sibling_index = index ^ 1
+            path.append({
+                "hash": self._node(level, sibling_index).hex(),
+                "position": "left" if sibling_index < index else "right"
+            })
+            index //= 2
+        return path
+
+    def to_document(self) -> Dict:
+        return {"version": self.version, "levels": self.levels}
+
+    @classmethod
+    def from_document(cls, doc: Dict) -> "MerkleTree":
+        return cls([bytes(level) for level in doc["levels"]], doc.get("version", MERKLE_VERSION))
+
+
+def merkle_root(tx_hashes: List[str], version: int = MERKLE_VERSION) -> str:
+    """Merkle root (hex) of transaction hashes under the given scheme"""
+    if version == LEGACY_MERKLE_VERSION:
+        from crypto_utils import compute_merkle_root
+        return compute_merkle_root(tx_hashes)
+    return MerkleTree.from_tx_hashes(tx_hashes, version).root_hex
+
+
+def verify_proof(tx_hash: str, proof: List[Dict[str, str]], root: str,
+                 version: int = MERKLE_VERSION) -> bool:
+    """Check an inclusion proof from MerkleTree.proof against a block's merkle root"""
+    try:
+        hash_pair = _HASH_PAIR[version]
+        node = bytes.fromhex(tx_hash)
+        for step in proof:
+            sibling = bytes.fromhex(step["hash"])
+            if step["position"] == "left":
+                node = hash_pair(sibling, node)
+            elif step["position"] == "right":
+                node = hash_pair(node, sibling)
+            else:
+                return False
+        return node.hex() == root
+    except (KeyError, TypeError, ValueError):
+        return False
@@ -41,6 +41,10 @@ class User(BaseModel):
     created_at: str
 
 
+class UserRoleUpdate(BaseModel):
+    role: UserRole
+
+
 class WalletCreate(BaseModel):
     user_id: str
 
@@ -69,6 +73,25 @@ class TransactionCreate(BaseModel):
         return v
 
 
+class TransactionBatchCreate(BaseModel):
+    transactions: List[TransactionCreate] = Field(..., min_length=1, max_length=5000)
+
+
+class TransactionBatchItemResult(BaseModel):
+    index: int
+    status: str  # "pending" when accepted, otherwise "rejected"
+    tx_id: Optional[str] = None
+    tx_hash: Optional[str] = None
+    status_code: int = 200
+    error: Optional[str] = None
+
+
+class TransactionBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[TransactionBatchItemResult]
+
+
 class Transaction(BaseModel):
     model_config = ConfigDict(extra="ignore")
     
@@ -95,6 +118,7 @@ class Block(BaseModel):
     block_number: int
     previous_hash: str
     merkle_root: str
+    merkle_version: int = 1
     timestamp: str
     nonce: int
     block_hash: str
@@ -109,6 +133,30 @@ class BlockDetail(BaseModel):
     transactions: List[Transaction]
 
 
+class MerkleProofStep(BaseModel):
+    hash: str
+    position: str  # side the sibling sits on: "left" or "right"
+
+
+class MerkleProof(BaseModel):
+    tx_id: str
+    tx_hash: str
+    block_id: str
+    block_number: int
+    merkle_root: str
+    merkle_version: int
+    leaf_index: int
+    leaf_count: int
+    proof: List[MerkleProofStep]
+
+
+class MerkleProofVerifyRequest(BaseModel):
+    tx_hash: str
+    merkle_root: str
+    merkle_version: int = 2
+    proof: List[MerkleProofStep]
+
+
 class Notification(BaseModel):
     model_config = ConfigDict(extra="ignore")
     
@@ -138,6 +186,9 @@ class ValidationReport(BaseModel):
     valid: bool
     total_blocks: int
     issues: List[str] = []
+    full: bool = True
+    checked_blocks: int = 0
+    checkpoint_block: Optional[int] = None
 
 
 class StatsResponse(BaseModel):
@@ -145,3 +196,31 @@ class StatsResponse(BaseModel):
     total_blocks: int
     total_transactions: int
     recent_transactions: List[Transaction]
+
+
+class BlockProducerSettings(BaseModel):
+    enabled: bool = True
+    max_transactions: int = Field(500, gt=0)
+    max_bytes: int = Field(1_000_000, gt=0)
+    max_age_seconds: float = Field(30.0, gt=0)
+    poll_interval_seconds: float = Field(2.0, gt=0)
+    validator: str = "block-producer"
+
+
+class BlockProducerStats(BaseModel):
+    running: bool = False
+    runs: int = 0
+    blocks_produced: int = 0
+    transactions_confirmed: int = 0
+    last_run_at: Optional[str] = None
+    last_block_number: Optional[int] = None
+    last_block_size: Optional[int] = None
+    last_block_bytes: Optional[int] = None
+    last_trigger: Optional[str] = None
+    last_commit_ms: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class BlockProducerStatus(BaseModel):
+    settings: BlockProducerSettings
+    stats: BlockProducerStats
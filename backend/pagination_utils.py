@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor for a position in a sorted listing"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fields: Dict[str, type]) -> Dict[str, Any]:
+    """Position from encode_cursor; ValueError if it is malformed or a field is missing or mistyped.
+
+    Values go straight into query filters, so anything but the expected
+    scalar type (e.g. an operator document like {"$gt": ""}) is refused.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    for field, field_type in fields.items():
+        value = position.get(field)
+        # bool is an int subclass; true is not a block number
+        if not isinstance(value, field_type) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+    return {field: position[field] for field in fields}
+
+
+def transaction_cursor(tx: Dict) -> str:
+    return encode_cursor({"ts": tx["timestamp"], "id": tx["tx_id"]})
+
+
+def transactions_after(cursor: Optional[str], branches: List[Dict]) -> Dict:
+    """Filter for transactions after a cursor, newest first by (timestamp, tx_id).
+
+    ``branches`` are the $or alternatives (e.g. sender / receiver). The
+    timestamp bound goes into every branch so each one stays an index range
+    scan that MongoDB can merge; the tie on equal timestamps is a residual
+    $nor. No skip, so a page costs the same at any depth.
+    """
+    if not cursor:
+        return {"$or": branches} if len(branches) > 1 else branches[0]
+
+    position = decode_cursor(cursor, {"ts": str, "id": str})
+    bounded = [{**branch, "timestamp": {"$lte": position["ts"]}} for branch in branches]
+    return {
+        "$or": bounded,
+        "$nor": [{"timestamp": position["ts"], "tx_id": {"$gte": position["id"]}}]
+    }
+
+
+def block_cursor(block: Dict) -> str:
+    return encode_cursor({"bn": block["block_number"]})
+
+
+def blocks_after(cursor: Optional[str]) -> Dict:
+    """Filter for blocks after a cursor, highest block_number first"""
+    if not cursor:
+        return {}
+    position = decode_cursor(cursor, {"bn": int})
+    return {"block_number": {"$lt": position["bn"]}}
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+BlockBank - Rebuild Wallet Balances Script
+Recomputes the wallet_balances table from confirmed transactions.
+
+Usage: python3 rebuild_balances.py [--check]
+  --check   Report drift only, do not rewrite the table
+"""
+
+import asyncio
+import sys
+
+# Add backend to path
+sys.path.insert(0, '/app/backend')
+import database
+from services.balance_service import rebuild_balances
+
+
+async def rebuild(dry_run: bool):
+    """Reconcile wallet_balances against the ledger"""
+    db = database.db
+
+    try:
+        report = await rebuild_balances(db, dry_run=dry_run)
+
+        print("\n" + "=" * 90)
+        print(f"{'Wallet':<40} {'Stored':>20} {'Expected':>20}")
+        print("=" * 90)
+
+        for item in report["drifted"]:
+            stored = "missing" if item["stored"] is None else f"${item['stored']:,.2f}"
+            print(f"{item['wallet_address'][:38]:<40} {stored:>20} ${item['expected']:>19,.2f}")
+
+        print("=" * 90)
+        print(f"🧮 Wallets in ledger:  {report['wallets']}")
+        print(f"⚠️  Drifted wallets:    {len(report['drifted'])}")
+        if report["skipped"]:
+            print(f"⏭️  Skipped wallets:    {len(report['skipped'])} (a block touched them mid-rebuild; run again)")
+        if dry_run:
+            print("📝 Check only - wallet_balances was not modified")
+        else:
+            print("✅ wallet_balances rebuilt from the ledger")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+    finally:
+        database.close()
+
+
+def main():
+    """Main entry point"""
+    dry_run = len(sys.argv) > 1 and sys.argv[1] in ("--check", "-c")
+    asyncio.run(rebuild(dry_run))
+
+
+if __name__ == "__main__":
+    main()
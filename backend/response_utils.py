@@ -0,0 +1,68 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Debug switch: validate every document through its model as before (slow, catches bad data)
+STRICT_RESPONSES = os.environ.get('STRICT_RESPONSES', 'false').lower() in ('1', 'true', 'yes')
+
+if orjson is None:
+    logger.warning("orjson not installed; list responses use the standard json encoder")
+FastJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+@lru_cache(maxsize=None)
+def _model_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, bool, Any], ...]:
+    """(name, required, default) for each field of a response model"""
+    return tuple(
+        (name, field.is_required(), None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    )
+
+
+def model_projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection returning exactly the model's fields, so nothing extra is read or sent"""
+    projection = {name: 1 for name, _, _ in _model_fields(model)}
+    projection["_id"] = 0
+    return projection
+
+
+def trusted_documents(model: Type[BaseModel], docs: List[Dict]) -> List[Dict]:
+    """Documents shaped like model.model_dump() without validating them.
+
+    Only for documents this app wrote itself: missing optional fields get
+    their defaults and unknown fields are dropped, but types are taken as
+    stored.
+    """
+    fields = _model_fields(model)
+    return [
+        {name: doc[name] if required or name in doc else default for name, required, default in fields}
+        for doc in docs
+    ]
+
+
+def model_list_response(model: Type[BaseModel], docs: List[Dict], response: Response):
+    """Return value for a list endpoint declared with response_model=List[model].
+
+    The fast path skips both pydantic passes (model(**doc) and FastAPI's
+    response_model check) and encodes with orjson; headers already set on
+    the injected ``response`` are carried over. With STRICT_RESPONSES the
+    models are built and validated as usual.
+    """
+    if STRICT_RESPONSES:
+        return [model(**doc) for doc in docs]
+    fast = FastJSONResponse(trusted_documents(model, docs))
+    for key, value in response.headers.items():
+        fast.headers[key] = value
+    return fast
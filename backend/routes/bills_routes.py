@@ -4,17 +4,15 @@ Bill Payment Routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 from typing import List
 import uuid
 import os
 
+from database import db
+
 router = APIRouter(prefix="/bills", tags=["bills"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'bank_blockchain_db')]
 
 BILL_TYPES = [
     {"id": "electricity", "name": "Electricity Bill", "icon": "⚡", "color": "#FDB813"},
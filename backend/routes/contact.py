@@ -5,6 +5,7 @@ from bson import ObjectId
 from database import db  # your MongoDB connection
 from models.user import User
 from core.auth import get_current_user  # if login is required
+from services.notification_hub import notification_hub
 
 router = APIRouter()
 
@@ -35,5 +36,6 @@ async def contact_us(data: ContactForm):
     }
 
     await db.notifications.insert_one(notification_data)
+    notification_hub.publish(notification_data)
 
     return {"message": "Your message has been sent successfully!"}
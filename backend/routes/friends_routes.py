@@ -4,17 +4,13 @@ Add friends by email, send money easily
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import uuid
 import os
 
-router = APIRouter(prefix="/friends", tags=["friends"])
+from database import db
 
-# Database connection
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'bank_blockchain_db')]
+router = APIRouter(prefix="/friends", tags=["friends"])
 
 
 @router.post("/add")
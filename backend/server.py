@@ -1,43 +1,107 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from bson import ObjectId
 import os
 import sys
+import json
+import asyncio
 sys.path.append('/app/backend')
 import logging
 from pathlib import Path
 from typing import Optional, List
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import uuid
 
 from models import (
-    UserCreate, UserLogin, User, AuthResponse, UserRole,
+    UserCreate, UserLogin, User, AuthResponse, UserRole, UserRoleUpdate,
     WalletCreate, Wallet, BalanceResponse,
     TransactionCreate, Transaction, TransactionStatus,
+    TransactionBatchCreate, TransactionBatchItemResult, TransactionBatchResult,
     BlockCreate, Block, BlockDetail,
     Notification, NotificationCreate,
-    StatsResponse, ValidationReport
+    StatsResponse, ValidationReport,
+    MerkleProof, MerkleProofVerifyRequest,
+    BlockProducerSettings, BlockProducerStatus
 )
 from auth_utils import hash_password, verify_password, create_access_token, decode_token
+import database
+from cache_utils import LRUCache
+from merkle import verify_proof
+from response_utils import model_list_response, model_projection, trusted_documents
+from pagination_utils import (
+    NEXT_CURSOR_HEADER, transaction_cursor, transactions_after, block_cursor, blocks_after
+)
 from crypto_utils import (
     generate_keypair, sign_message, verify_signature,
     encrypt_private_key, decrypt_private_key,
-    compute_transaction_hash, compute_block_hash, compute_merkle_root
+    compute_transaction_hash, signature_cache_stats,
+    sign_message_with_key, is_legacy_encrypted_key
+)
+from services.balance_service import (
+    get_balance, get_balances, rebuild_balances, ensure_balances_initialized
+)
+from services.index_manager import IndexManager
+from services.blockchain_service import BlockchainService, BlockCommitError, TransactionsUnsupportedError
+from services.block_producer import BlockProducer
+from services.mempool import Mempool
+from services.merkle_service import build_inclusion_proof, MerkleTreeMismatchError
+from services.signature_verifier import SignatureVerifier
+from services.kdf_executor import KdfExecutor, KdfQueueFullError
+from services.auth_cache import AuthCache
+from services.signing_key_cache import SigningKeyCache, zero_key
+from services.keypair_pool import KeypairPool
+from services.stats_service import (
+    increment_counters, get_counters, get_recent_transactions, ensure_counters_initialized
+)
+from services.chain_export import iter_export_lines
+from services.notification_hub import notification_hub, find_notifications_after
+from services.chain_validator import (
+    validate_chain, iter_validation, backfill_link_positions, shutdown_pool as shutdown_validation_pool
 )
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'bank_blockchain_db')]
+# MongoDB connection, shared with every router and script
+db = database.db
+
+# Required indexes, created on startup
+index_manager = IndexManager(db)
+
+# Pending transactions, loaded from the DB at startup
+mempool = Mempool()
+
+# Background block producer, started with the app
+block_producer = BlockProducer(db, mempool)
+
+# Worker pool that keeps ECDSA verifies off the event loop
+signature_verifier = SignatureVerifier()
+
+# Bounded pool for bcrypt and private-key encryption (PBKDF2)
+kdf_executor = KdfExecutor()
+
+# Decoded tokens and user records for get_current_user
+auth_cache = AuthCache()
+
+# Unlocked private keys for /transaction/sign (off unless SIGNING_KEY_CACHE_ENABLED)
+signing_keys = SigningKeyCache()
 
 # Master key for encrypting private keys
 MASTER_KEY = os.environ.get('MASTER_KEY', 'change-this-master-key-in-production')
 
+# Serialized GET /block/{block_id} responses; blocks never change once written
+BLOCK_CACHE_SIZE = int(os.environ.get('BLOCK_CACHE_SIZE', '512'))
+block_responses = LRUCache(maxsize=BLOCK_CACHE_SIZE)
+# block_id -> ETag, kept for many more blocks so conditional GETs skip Mongo
+block_etags = LRUCache(maxsize=BLOCK_CACHE_SIZE * 16)
+
+# Pre-generated wallet keypairs for register
+keypair_pool = KeypairPool(MASTER_KEY)
+
 # Create the main app
 app = FastAPI(title="Bank Blockchain API")
 
@@ -64,24 +128,33 @@ api_router = APIRouter(prefix="/api")
 security = HTTPBearer()
 
 
+async def run_kdf(fn, *args):
+    """Run a bcrypt/PBKDF2 call on the KDF pool; 503 when its queue is full"""
+    try:
+        return await kdf_executor.run(fn, *args)
+    except KdfQueueFullError:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+
 # Authentication dependency
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Get current authenticated user from JWT token"""
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = auth_cache.decode(token)
     
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
     user_id = payload.get("user_id")
-    if not user_id:
+    if not user_id or payload.get("scope"):
+        # Scoped tokens (notification stream tickets) are not access tokens
         raise HTTPException(status_code=401, detail="Invalid token payload")
     
-    user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
-    if not user_doc:
+    user = await auth_cache.get_user(db, user_id)
+    if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return User(**user_doc)
+    return user
 
 
 async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
@@ -103,7 +176,7 @@ async def register(user_data: UserCreate):
     
     # Create user
     user_id = str(uuid.uuid4())
-    password_hash = hash_password(user_data.password)
+    password_hash = await run_kdf(hash_password, user_data.password)
     
     user_doc = {
         "user_id": user_id,
@@ -115,10 +188,15 @@ async def register(user_data: UserCreate):
     }
     
     await db.users.insert_one(user_doc)
+    await increment_counters(db, users=1)
     
-    # Generate wallet
-    public_key, private_key = generate_keypair()
-    encrypted_private_key = encrypt_private_key(private_key, MASTER_KEY)
+    # Generate wallet, from the pre-generated pool when one is ready
+    pair = keypair_pool.take()
+    if pair:
+        public_key, encrypted_private_key = pair
+    else:
+        public_key, private_key = generate_keypair()
+        encrypted_private_key = await run_kdf(encrypt_private_key, private_key, MASTER_KEY)
     
     wallet_id = str(uuid.uuid4())
     wallet_doc = {
@@ -150,7 +228,7 @@ async def login(credentials: UserLogin):
     """Login user"""
     user_doc = await db.users.find_one({"email": credentials.email})
     
-    if not user_doc or not verify_password(credentials.password, user_doc["password_hash"]):
+    if not user_doc or not await run_kdf(verify_password, credentials.password, user_doc["password_hash"]):
        raise HTTPException(status_code=401, detail="Invalid credentials")
 
     
@@ -184,36 +262,41 @@ async def get_wallet_balance(address: str, current_user: User = Depends(get_curr
     if not wallet:
         raise HTTPException(status_code=404, detail="Wallet not found")
     
-    # Calculate balance from confirmed transactions
-    received_txs = await db.transactions.find({
-        "receiver_wallet": address,
-        "status": TransactionStatus.confirmed.value
-    }).to_list(None)
+    # Confirmed balance is materialized in wallet_balances at block commit
+    balance = await get_balance(db, address)
     
-    sent_txs = await db.transactions.find({
-        "sender_wallet": address,
-        "status": TransactionStatus.confirmed.value
-    }).to_list(None)
-    
-    received = sum(tx["amount"] for tx in received_txs)
-    sent = sum(tx["amount"] for tx in sent_txs)
+    return BalanceResponse(wallet_address=address, balance=balance)
+
+
+async def find_transactions_page(response: Response, branches: List[dict], cursor: Optional[str], limit: int):
+    """One newest-first page of transactions; sets X-Next-Cursor when more may follow"""
+    try:
+        query = transactions_after(cursor, branches)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    balance = received - sent
+    transactions = await db.transactions.find(query, model_projection(Transaction)).sort(
+        [("timestamp", -1), ("tx_id", -1)]
+    ).limit(limit).to_list(None)
     
-    return BalanceResponse(wallet_address=address, balance=balance)
+    if len(transactions) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = transaction_cursor(transactions[-1])
+    return model_list_response(Transaction, transactions, response)
 
 
 @api_router.get("/wallet/{address}/transactions", response_model=List[Transaction])
-async def get_wallet_transactions(address: str, current_user: User = Depends(get_current_user)):
-    """Get transaction history for a wallet"""
-    transactions = await db.transactions.find({
-        "$or": [
-            {"sender_wallet": address},
-            {"receiver_wallet": address}
-        ]
-    }, {"_id": 0}).sort("timestamp", -1).to_list(100)
-    
-    return [Transaction(**tx) for tx in transactions]
+async def get_wallet_transactions(
+    address: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """Get transaction history for a wallet (pass X-Next-Cursor back as cursor for the next page)"""
+    return await find_transactions_page(response, [
+        {"sender_wallet": address},
+        {"receiver_wallet": address}
+    ], cursor, limit)
 
 
 @api_router.get("/wallet/my-wallets", response_model=List[Wallet])
@@ -243,8 +326,8 @@ async def create_transaction(tx_data: TransactionCreate, current_user: User = De
         raise HTTPException(status_code=404, detail="Receiver wallet not found")
     
     # Check balance
-    balance_resp = await get_wallet_balance(tx_data.sender_wallet, current_user)
-    if balance_resp.balance < tx_data.amount:
+    balance = await get_balance(db, tx_data.sender_wallet)
+    if balance < tx_data.amount:
         raise HTTPException(status_code=400, detail="Insufficient balance")
     
     # Compute transaction hash using provided timestamp
@@ -256,9 +339,13 @@ async def create_transaction(tx_data: TransactionCreate, current_user: User = De
         tx_data.nonce
     )
     
+    # Reject replays of a transaction that is pending or already stored
+    if tx_hash in mempool or await db.transactions.find_one({"tx_hash": tx_hash}, {"_id": 1}):
+        raise HTTPException(status_code=409, detail="Duplicate transaction")
+    
     # Verify signature
     message = tx_hash
-    if not verify_signature(message, tx_data.signature, tx_data.sender_wallet):
+    if not await signature_verifier.verify(message, tx_data.signature, tx_data.sender_wallet):
         raise HTTPException(status_code=400, detail="Invalid signature")
     
     # Create transaction
@@ -275,36 +362,167 @@ async def create_transaction(tx_data: TransactionCreate, current_user: User = De
         "nonce": tx_data.nonce
     }
     
-    await db.transactions.insert_one(tx_doc)
+    try:
+        await db.transactions.insert_one(tx_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Duplicate transaction")
+    
+    tx_doc.pop("_id", None)
+    mempool.add(tx_doc)
+    await increment_counters(db, transactions=1)
     
     # Create notification
-    await db.notifications.insert_one({
+    notif_doc = {
         "notification_id": str(uuid.uuid4()),
         "user_id": receiver_wallet["user_id"],
         "message": f"You received {tx_data.amount} from {tx_data.sender_wallet[:10]}...",
         "timestamp": tx_data.timestamp,  # Use provided timestamp
         "status": "unread"
-    })
+    }
+    await db.notifications.insert_one(notif_doc)
+    notification_hub.publish(notif_doc)
     
     return {"tx_id": tx_id, "status": "pending", "tx_hash": tx_hash}
 
 
+@api_router.post("/transaction/batch", response_model=TransactionBatchResult)
+async def create_transaction_batch(batch: TransactionBatchCreate, current_user: User = Depends(get_current_user)):
+    """Create many signed transactions in one call; each item is accepted or rejected on its own"""
+    items = batch.transactions
+    results = [TransactionBatchItemResult(index=i, status="pending") for i in range(len(items))]
+    
+    def reject(i: int, status_code: int, error: str):
+        results[i].status = "rejected"
+        results[i].status_code = status_code
+        results[i].error = error
+    
+    tx_hashes = [
+        compute_transaction_hash(tx.sender_wallet, tx.receiver_wallet, tx.amount, tx.timestamp, tx.nonce)
+        for tx in items
+    ]
+    for i, tx_hash in enumerate(tx_hashes):
+        results[i].tx_hash = tx_hash
+    
+    # One query each for the wallets involved and already-stored hashes
+    addresses = {tx.sender_wallet for tx in items} | {tx.receiver_wallet for tx in items}
+    wallets = {
+        w["wallet_address"]: w
+        async for w in db.wallets.find(
+            {"wallet_address": {"$in": list(addresses)}},
+            {"_id": 0, "wallet_address": 1, "user_id": 1}
+        )
+    }
+    stored = {
+        tx["tx_hash"]
+        async for tx in db.transactions.find({"tx_hash": {"$in": tx_hashes}}, {"_id": 0, "tx_hash": 1})
+    }
+    
+    seen = set()
+    for i, tx in enumerate(items):
+        sender_wallet = wallets.get(tx.sender_wallet)
+        if not sender_wallet or sender_wallet["user_id"] != current_user.user_id:
+            reject(i, 403, "Unauthorized wallet")
+        elif tx.receiver_wallet not in wallets:
+            reject(i, 404, "Receiver wallet not found")
+        elif tx_hashes[i] in seen or tx_hashes[i] in mempool or tx_hashes[i] in stored:
+            reject(i, 409, "Duplicate transaction")
+        seen.add(tx_hashes[i])
+    
+    # Verify the remaining signatures in parallel on the verifier pool
+    to_verify = [i for i, r in enumerate(results) if r.status == "pending"]
+    valid = await signature_verifier.verify_batch(
+        [(tx_hashes[i], items[i].signature, items[i].sender_wallet) for i in to_verify]
+    )
+    for i, ok in zip(to_verify, valid):
+        if not ok:
+            reject(i, 400, "Invalid signature")
+    
+    # Each sender's accepted transfers must fit its balance cumulatively, in request order
+    remaining = await get_balances(db, {items[i].sender_wallet for i in to_verify})
+    for i, r in enumerate(results):
+        if r.status != "pending":
+            continue
+        tx = items[i]
+        if remaining[tx.sender_wallet] < tx.amount:
+            reject(i, 400, "Insufficient balance")
+        else:
+            remaining[tx.sender_wallet] -= tx.amount
+    
+    accepted = [i for i, r in enumerate(results) if r.status == "pending"]
+    tx_docs = []
+    for i in accepted:
+        tx = items[i]
+        results[i].tx_id = str(uuid.uuid4())
+        tx_docs.append({
+            "tx_id": results[i].tx_id,
+            "sender_wallet": tx.sender_wallet,
+            "receiver_wallet": tx.receiver_wallet,
+            "amount": tx.amount,
+            "timestamp": tx.timestamp,
+            "tx_hash": tx_hashes[i],
+            "signature": tx.signature,
+            "status": TransactionStatus.pending.value,
+            "nonce": tx.nonce
+        })
+    
+    if tx_docs:
+        failed = set()
+        try:
+            await db.transactions.insert_many(tx_docs, ordered=False)
+        except BulkWriteError as e:
+            # A concurrent submit stored the same tx_hash first
+            for error in e.details.get("writeErrors", []):
+                failed.add(error["index"])
+                i = accepted[error["index"]]
+                results[i].tx_id = None
+                reject(i, 409 if error.get("code") == 11000 else 500,
+                       "Duplicate transaction" if error.get("code") == 11000 else "Write failed")
+        
+        inserted = [doc for n, doc in enumerate(tx_docs) if n not in failed]
+        for doc in inserted:
+            doc.pop("_id", None)
+            mempool.add(doc)
+        await increment_counters(db, transactions=len(inserted))
+        
+        if inserted:
+            notif_docs = [
+                {
+                    "notification_id": str(uuid.uuid4()),
+                    "user_id": wallets[doc["receiver_wallet"]]["user_id"],
+                    "message": f"You received {doc['amount']} from {doc['sender_wallet'][:10]}...",
+                    "timestamp": doc["timestamp"],
+                    "status": "unread"
+                }
+                for doc in inserted
+            ]
+            await db.notifications.insert_many(notif_docs)
+            notification_hub.publish_many(notif_docs)
+    
+    accepted_count = sum(1 for r in results if r.status == "pending")
+    return TransactionBatchResult(
+        accepted=accepted_count,
+        rejected=len(results) - accepted_count,
+        results=results
+    )
+
+
 @api_router.get("/transaction/history", response_model=List[Transaction])
-async def get_transaction_history(current_user: User = Depends(get_current_user)):
-    """Get user's transaction history"""
+async def get_transaction_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """Get user's transaction history (pass X-Next-Cursor back as cursor for the next page)"""
     # Get user's wallets
     wallets = await db.wallets.find({"user_id": current_user.user_id}).to_list(None)
     wallet_addresses = [w["wallet_address"] for w in wallets]
     
     # Get transactions
-    transactions = await db.transactions.find({
-        "$or": [
-            {"sender_wallet": {"$in": wallet_addresses}},
-            {"receiver_wallet": {"$in": wallet_addresses}}
-        ]
-    }, {"_id": 0}).sort("timestamp", -1).to_list(100)
-    
-    return [Transaction(**tx) for tx in transactions]
+    return await find_transactions_page(response, [
+        {"sender_wallet": {"$in": wallet_addresses}},
+        {"receiver_wallet": {"$in": wallet_addresses}}
+    ], cursor, limit)
 
 
 @api_router.get("/transaction/{tx_id}", response_model=Transaction)
@@ -317,6 +535,23 @@ async def get_transaction(tx_id: str, current_user: User = Depends(get_current_u
     return Transaction(**tx)
 
 
+@api_router.get("/transaction/{tx_id}/proof", response_model=MerkleProof)
+async def get_transaction_proof(tx_id: str, current_user: User = Depends(get_current_user)):
+    """Merkle inclusion proof for a confirmed transaction"""
+    tx = await db.transactions.find_one({"tx_id": tx_id}, {"_id": 0, "tx_id": 1, "tx_hash": 1})
+    if not tx:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    
+    try:
+        proof = await build_inclusion_proof(db, tx)
+    except MerkleTreeMismatchError:
+        raise HTTPException(status_code=404, detail="No valid proof: block transactions do not match its merkle root")
+    if not proof:
+        raise HTTPException(status_code=404, detail="Transaction is not in a block yet")
+    
+    return MerkleProof(**proof)
+
+
 class SignTransactionRequest(BaseModel):
     sender_wallet: str
     receiver_wallet: str
@@ -345,11 +580,26 @@ async def sign_transaction_hash(request: SignTransactionRequest, current_user: U
         request.nonce
     )
     
-    # Decrypt private key
-    private_key = decrypt_private_key(wallet["encrypted_private_key"], MASTER_KEY)
+    # Unlock the private key, unless it is still cached
+    key = signing_keys.get(wallet["wallet_address"])
+    if key is None:
+        encrypted = wallet["encrypted_private_key"]
+        private_key = await run_kdf(decrypt_private_key, encrypted, MASTER_KEY)
+        
+        if is_legacy_encrypted_key(encrypted):
+            # Re-wrap in the env1 format so later unlocks skip the per-key PBKDF2
+            rewrapped = await run_kdf(encrypt_private_key, private_key, MASTER_KEY)
+            await db.wallets.update_one(
+                {"wallet_id": wallet["wallet_id"], "encrypted_private_key": encrypted},
+                {"$set": {"encrypted_private_key": rewrapped}}
+            )
+        
+        key = signing_keys.put(wallet["wallet_address"], private_key)
     
     # Sign the transaction hash
-    signature = sign_message(tx_hash, private_key)
+    signature = sign_message_with_key(tx_hash, key)
+    if not signing_keys.enabled:
+        zero_key(key)
     
     return {"signature": signature, "tx_hash": tx_hash, "wallet_address": wallet["wallet_address"]}
 
@@ -368,130 +618,160 @@ async def add_block(block_data: BlockCreate, admin: User = Depends(get_admin_use
     if not pending_txs:
         raise HTTPException(status_code=400, detail="No valid pending transactions")
     
-    # Get last block
-    last_block = await db.blocks.find_one({}, {"_id": 0}, sort=[("block_number", -1)])
-    
-    if last_block:
-        block_number = last_block["block_number"] + 1
-        previous_hash = last_block["block_hash"]
-    else:
-        block_number = 0
-        previous_hash = "0" * 64
-    
-    # Compute merkle root
-    tx_hashes = [tx["tx_hash"] for tx in pending_txs]
-    merkle_root = compute_merkle_root(tx_hashes)
-    
-    # Compute block hash (simple nonce=0 for admin validation)
-    timestamp = datetime.now(timezone.utc).isoformat()
-    nonce = 0
-    block_hash = compute_block_hash(block_number, previous_hash, merkle_root, timestamp, nonce)
-    
-    # Create block
-    block_id = str(uuid.uuid4())
-    block_doc = {
-        "block_id": block_id,
-        "block_number": block_number,
-        "previous_hash": previous_hash,
-        "merkle_root": merkle_root,
-        "timestamp": timestamp,
-        "nonce": nonce,
-        "block_hash": block_hash,
-        "validator": block_data.validator,
-        "created_at": timestamp
-    }
-    
-    await db.blocks.insert_one(block_doc)
+    # Write the block and its confirmations atomically
+    try:
+        # Serialized with the producer, and held off while balances are rebuilt
+        async with block_producer.paused():
+            block_doc = await BlockchainService.commit_block(db, pending_txs, block_data.validator)
+    except TransactionsUnsupportedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except BlockCommitError as e:
+        await mempool.reconcile(db, pending_txs)
+        raise HTTPException(status_code=409, detail=str(e))
     
-    # Link transactions to block
-    for tx in pending_txs:
-        await db.block_transactions.insert_one({
-            "id": str(uuid.uuid4()),
-            "block_id": block_id,
-            "tx_id": tx["tx_id"]
-        })
-        
-        # Mark transaction as confirmed
-        await db.transactions.update_one(
-            {"tx_id": tx["tx_id"]},
-            {"$set": {"status": TransactionStatus.confirmed.value}}
-        )
+    mempool.remove(pending_txs)
     
-    return {"block_id": block_id, "block_hash": block_hash, "block_number": block_number}
+    return {
+        "block_id": block_doc["block_id"],
+        "block_hash": block_doc["block_hash"],
+        "block_number": block_doc["block_number"]
+    }
 
 
 @api_router.get("/blockchain/view", response_model=List[Block])
-async def view_blockchain(page: int = 1, limit: int = 20, current_user: User = Depends(get_current_user)):
-    """View blockchain (paginated)"""
-    skip = (page - 1) * limit
-    
-    blocks = await db.blocks.find({}, {"_id": 0}).sort("block_number", -1).skip(skip).limit(limit).to_list(None)
+async def view_blockchain(
+    response: Response,
+    page: int = 1,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """View blockchain (paginated by page, or by cursor from X-Next-Cursor at any depth)"""
+    if cursor:
+        try:
+            query = blocks_after(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        blocks = await db.blocks.find(query, model_projection(Block)).sort("block_number", -1).limit(limit).to_list(None)
+    else:
+        skip = (page - 1) * limit
+        blocks = await db.blocks.find({}, model_projection(Block)).sort("block_number", -1).skip(skip).limit(limit).to_list(None)
     
-    return [Block(**b) for b in blocks]
+    if blocks and len(blocks) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = block_cursor(blocks[-1])
+    return model_list_response(Block, blocks, response)
 
 
-@api_router.get("/block/{block_id}", response_model=BlockDetail)
-async def get_block(block_id: str, current_user: User = Depends(get_current_user)):
-    """Get block details with transactions"""
-    block = await db.blocks.find_one({"block_id": block_id}, {"_id": 0})
-    if not block:
-        raise HTTPException(status_code=404, detail="Block not found")
-    
-    # Get block transactions
-    block_tx_links = await db.block_transactions.find({"block_id": block_id}).to_list(None)
-    tx_ids = [link["tx_id"] for link in block_tx_links]
-    
-    transactions = await db.transactions.find({"tx_id": {"$in": tx_ids}}, {"_id": 0}).to_list(None)
-    
-    return BlockDetail(
-        block=Block(**block),
-        transactions=[Transaction(**tx) for tx in transactions]
-    )
+# Blocks are immutable, so clients may keep them indefinitely
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
 
 
-@api_router.get("/blockchain/validate", response_model=ValidationReport)
-async def validate_blockchain(admin: User = Depends(get_admin_user)):
-    """Validate entire blockchain integrity"""
-    blocks = await db.blocks.find({}, {"_id": 0}).sort("block_number", 1).to_list(None)
-    
-    issues = []
-    
-    for i, block in enumerate(blocks):
-        # Check previous hash link
-        if i > 0:
-            if block["previous_hash"] != blocks[i-1]["block_hash"]:
-                issues.append(f"Block {block['block_number']}: Invalid previous_hash")
-        
-        # Verify block hash
-        computed_hash = compute_block_hash(
-            block["block_number"],
-            block["previous_hash"],
-            block["merkle_root"],
-            block["timestamp"],
-            block["nonce"]
-        )
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names this (strong) ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@api_router.get("/block/{block_id}", response_model=BlockDetail)
+async def get_block(
+    block_id: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Get block details with transactions (ETag is the block hash; supports If-None-Match)"""
+    etag = block_etags.get(block_id)
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+    
+    cached = block_responses.get(block_id)
+    if cached:
+        etag, body = cached
+    else:
+        block = await db.blocks.find_one({"block_id": block_id}, {"_id": 0})
+        if not block:
+            raise HTTPException(status_code=404, detail="Block not found")
         
-        if computed_hash != block["block_hash"]:
-            issues.append(f"Block {block['block_number']}: Invalid block hash")
+        etag = f'"{block["block_hash"]}"'
+        block_etags.set(block_id, etag)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL})
         
-        # Verify merkle root
-        block_tx_links = await db.block_transactions.find({"block_id": block["block_id"]}).to_list(None)
+        # Get block transactions
+        block_tx_links = await db.block_transactions.find({"block_id": block_id}).to_list(None)
         tx_ids = [link["tx_id"] for link in block_tx_links]
-        transactions = await db.transactions.find({"tx_id": {"$in": tx_ids}}, {"_id": 0}).to_list(None)
         
-        tx_hashes = [tx["tx_hash"] for tx in transactions]
-        computed_merkle = compute_merkle_root(tx_hashes)
+        transactions = await db.transactions.find({"tx_id": {"$in": tx_ids}}, {"_id": 0}).to_list(None)
         
-        if computed_merkle != block["merkle_root"]:
-            issues.append(f"Block {block['block_number']}: Invalid merkle root")
-    
-    return ValidationReport(
-        valid=len(issues) == 0,
-        total_blocks=len(blocks),
-        issues=issues
+        body = BlockDetail(
+            block=Block(**block),
+            transactions=[Transaction(**tx) for tx in transactions]
+        ).model_dump_json().encode()
+        block_responses.set(block_id, (etag, body))
+    
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
     )
 
 
+@api_router.get("/blockchain/validate", response_model=ValidationReport)
+async def validate_blockchain(full: bool = False, admin: User = Depends(get_admin_user)):
+    """Validate blockchain integrity since the last checkpoint (full=true audits every block)"""
+    return await validate_chain(db, full=full)
+
+
+@api_router.get("/blockchain/validate/stream")
+async def stream_blockchain_validation(request: Request, full: bool = False, admin: User = Depends(get_admin_user)):
+    """Validate blockchain integrity, streaming progress, issues and the final report as NDJSON"""
+    async def events():
+        validation = iter_validation(db, full=full)
+        try:
+            async for event in validation:
+                # Stop checking as soon as the client goes away
+                if await request.is_disconnected():
+                    break
+                yield json.dumps(event) + "\n"
+        finally:
+            await validation.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_router.get("/blockchain/export")
+async def export_blockchain(
+    request: Request,
+    from_block: int = Query(0, ge=0),
+    gzip: bool = False,
+    admin: User = Depends(get_admin_user)
+):
+    """Stream the chain as NDJSON, one block with its transactions per line (admin only).
+
+    Resume an interrupted download with from_block set to the last
+    block_number received plus one.
+    """
+    async def chunks():
+        export = iter_export_lines(db, from_block=from_block, compress=gzip)
+        try:
+            async for chunk in export:
+                if await request.is_disconnected():
+                    break
+                yield chunk
+        finally:
+            await export.aclose()
+    
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks(), media_type="application/x-ndjson", headers=headers)
+
+
 # ============= ADMIN ROUTES =============
 
 @api_router.get("/admin/users", response_model=List[User])
@@ -501,32 +781,130 @@ async def get_all_users(admin: User = Depends(get_admin_user)):
     return [User(**u) for u in users]
 
 
+@api_router.put("/admin/users/{user_id}/role", response_model=User)
+async def update_user_role(user_id: str, update: UserRoleUpdate, admin: User = Depends(get_admin_user)):
+    """Change a user's role (admin only)"""
+    result = await db.users.update_one({"user_id": user_id}, {"$set": {"role": update.role.value}})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    auth_cache.invalidate_user(user_id)
+    return await auth_cache.get_user(db, user_id)
+
+
+@api_router.get("/admin/signing-keys")
+async def get_signing_key_cache_stats(admin: User = Depends(get_admin_user)):
+    """Unlocked signing key cache stats (admin only)"""
+    return signing_keys.stats()
+
+
+@api_router.get("/admin/keypair-pool")
+async def get_keypair_pool_stats(admin: User = Depends(get_admin_user)):
+    """Pre-generated wallet keypair pool stats (admin only)"""
+    return keypair_pool.stats()
+
+
+@api_router.get("/admin/db-pool")
+async def get_db_pool_stats(admin: User = Depends(get_admin_user)):
+    """MongoDB connection pool settings and counters (admin only)"""
+    return database.pool_stats()
+
+
+@api_router.get("/admin/block-cache")
+async def get_block_cache_stats(admin: User = Depends(get_admin_user)):
+    """Block detail response cache stats (admin only)"""
+    return {"responses": block_responses.stats(), "etags": block_etags.stats()}
+
+
+@api_router.get("/admin/notification-streams")
+async def get_notification_stream_stats(admin: User = Depends(get_admin_user)):
+    """Open notification streams and delivery counters (admin only)"""
+    return notification_hub.stats()
+
+
+@api_router.get("/admin/auth-cache")
+async def get_auth_cache_stats(admin: User = Depends(get_admin_user)):
+    """Token and user cache hit rates (admin only)"""
+    return auth_cache.stats()
+
+
 @api_router.post("/admin/approve-transactions")
 async def approve_pending_transactions(admin: User = Depends(get_admin_user)):
     """Auto-approve and mine block with all pending transactions"""
-    pending_txs = await db.transactions.find(
-        {"status": TransactionStatus.pending.value},
-        {"_id": 0}
-    ).limit(10).to_list(None)
+    try:
+        block = await block_producer.produce(force=True, validator=admin.email)
+    except TransactionsUnsupportedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except BlockCommitError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    if not pending_txs:
+    if not block:
         return {"message": "No pending transactions"}
     
-    tx_ids = [tx["tx_id"] for tx in pending_txs]
-    
-    result = await add_block(
-        BlockCreate(pending_tx_ids=tx_ids, validator=admin.email),
-        admin
-    )
-    
-    return {"message": f"Block created with {len(tx_ids)} transactions", **result}
+    return {
+        "message": f"Block created with {block['transaction_count']} transactions",
+        "block_id": block["block_id"],
+        "block_hash": block["block_hash"],
+        "block_number": block["block_number"]
+    }
+
+
+@api_router.get("/admin/mempool")
+async def get_mempool_stats(admin: User = Depends(get_admin_user)):
+    """Pending transaction pool stats (admin only)"""
+    return mempool.stats()
+
+
+@api_router.get("/admin/block-producer", response_model=BlockProducerStatus)
+async def get_block_producer(admin: User = Depends(get_admin_user)):
+    """Block producer settings and last-run stats (admin only)"""
+    return BlockProducerStatus(settings=block_producer.settings, stats=block_producer.stats)
+
+
+@api_router.put("/admin/block-producer", response_model=BlockProducerStatus)
+async def update_block_producer(settings: BlockProducerSettings, admin: User = Depends(get_admin_user)):
+    """Change block producer thresholds at runtime (admin only)"""
+    block_producer.settings = settings
+    return BlockProducerStatus(settings=block_producer.settings, stats=block_producer.stats)
+
+
+@api_router.get("/admin/crypto/cache-stats")
+async def get_signature_cache_stats(admin: User = Depends(get_admin_user)):
+    """Signature verification cache hit rates (admin only)"""
+    return signature_cache_stats()
+
+
+@api_router.get("/admin/crypto/verifier")
+async def get_signature_verifier_stats(admin: User = Depends(get_admin_user)):
+    """Signature verification pool load (admin only)"""
+    return signature_verifier.stats()
+
+
+@api_router.get("/admin/kdf")
+async def get_kdf_stats(admin: User = Depends(get_admin_user)):
+    """Password hashing / key derivation pool load and timings (admin only)"""
+    return kdf_executor.stats()
+
+
+@api_router.post("/admin/balances/rebuild")
+async def rebuild_wallet_balances(dry_run: bool = False, admin: User = Depends(get_admin_user)):
+    """Recompute wallet_balances from the ledger and report drift (admin only)"""
+    # No block may commit in this process between summing the ledger and writing the table
+    async with block_producer.paused():
+        report = await rebuild_balances(db, dry_run=dry_run)
+    return {
+        "wallets": report["wallets"],
+        "drifted_count": len(report["drifted"]),
+        "drifted": report["drifted"][:100],
+        "skipped": report["skipped"],
+        "dry_run": report["dry_run"]
+    }
 
 
 # ============= NOTIFICATION ROUTES =============
 
-@api_router.get("/notifications", response_model=List[Notification])
-async def get_notifications(current_user: User = Depends(get_current_user)):
-    """Get notifications — user gets their own, admin gets all (including contact)"""
+def notification_query(current_user: User) -> dict:
+    """Notifications a user may see — user gets their own, admin gets all (including contact)"""
     query = {}
 
     # If normal user → show only their notifications
@@ -539,13 +917,132 @@ async def get_notifications(current_user: User = Depends(get_current_user)):
             {"user_id": None},
             {"user_id": current_user.user_id}
         ]
+    return query
+
+
+@api_router.get("/notifications", response_model=List[Notification])
+async def get_notifications(response: Response, current_user: User = Depends(get_current_user)):
+    """Get notifications — user gets their own, admin gets all (including contact)"""
+    query = notification_query(current_user)
 
     notifications = await db.notifications.find(
         query,
-        {"_id": 0}
+        model_projection(Notification)
     ).sort("timestamp", -1).limit(50).to_list(None)
 
-    return [Notification(**n) for n in notifications]
+    return model_list_response(Notification, notifications, response)
+
+
+# Seconds between keepalive comments on an idle notification stream
+NOTIFICATION_HEARTBEAT_SECONDS = float(os.environ.get('NOTIFICATION_HEARTBEAT_SECONDS', '15'))
+# Re-read the DB for missed notifications this often (set it when running several workers); 0 disables
+NOTIFICATION_RESYNC_SECONDS = float(os.environ.get('NOTIFICATION_RESYNC_SECONDS', '0'))
+
+# Stream tickets let EventSource, which cannot send an Authorization header, authenticate
+# in the URL without exposing the access token to access logs
+NOTIFICATION_TICKET_SCOPE = "notification_stream"
+NOTIFICATION_TICKET_SECONDS = int(os.environ.get('NOTIFICATION_TICKET_SECONDS', '60'))
+
+optional_security = HTTPBearer(auto_error=False)
+
+
+async def get_stream_user(
+    ticket: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> User:
+    """The stream's user, from an Authorization header or a ?ticket= from /notifications/stream-ticket"""
+    if credentials:
+        return await get_current_user(credentials)
+    
+    payload = decode_token(ticket) if ticket else None
+    if not payload or payload.get("scope") != NOTIFICATION_TICKET_SCOPE:
+        raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+    
+    user = await auth_cache.get_user(db, payload.get("user_id"))
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+@api_router.post("/notifications/stream-ticket")
+async def create_stream_ticket(current_user: User = Depends(get_current_user)):
+    """Short-lived ticket for opening /notifications/stream with EventSource"""
+    ticket = create_access_token(
+        {"user_id": current_user.user_id, "scope": NOTIFICATION_TICKET_SCOPE},
+        expires_delta=timedelta(seconds=NOTIFICATION_TICKET_SECONDS)
+    )
+    return {"ticket": ticket, "expires_in": NOTIFICATION_TICKET_SECONDS}
+
+
+def notification_event(notification: dict) -> str:
+    """One server-sent event; its id is the document's ObjectId, for Last-Event-ID"""
+    data = trusted_documents(Notification, [notification])[0]
+    return f"id: {notification['_id']}\nevent: notification\ndata: {json.dumps(data)}\n\n"
+
+
+@api_router.get("/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[str] = None,
+    current_user: User = Depends(get_stream_user)
+):
+    """Push new notifications as server-sent events; on reconnect, replays those after Last-Event-ID.
+
+    The ticket only has to be valid when the stream opens. EventSource
+    resends Last-Event-ID on its own reconnects; a client opening a fresh
+    stream with a new ticket passes the last id it saw as ?after=.
+    """
+    last_event_id = last_event_id or after
+    if last_event_id and not ObjectId.is_valid(last_event_id):
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    
+    query = notification_query(current_user)
+    channels = [current_user.user_id]
+    if current_user.role == UserRole.admin:
+        channels.append(None)
+    
+    async def events():
+        last_id = ObjectId(last_event_id) if last_event_id else None
+        loop = asyncio.get_running_loop()
+        next_resync = loop.time() + NOTIFICATION_RESYNC_SECONDS
+        # Subscribe before the catch-up query so nothing inserted in between is missed
+        subscription = notification_hub.subscribe(channels)
+        try:
+            yield "retry: 3000\n\n"
+            if last_id:
+                for notification in await find_notifications_after(db, query, last_id):
+                    yield notification_event(notification)
+                    last_id = notification["_id"]
+            
+            # An overflowed stream ends here; the client reconnects and catches up from the DB
+            while not subscription.overflowed:
+                try:
+                    notification = await asyncio.wait_for(subscription.queue.get(), NOTIFICATION_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    if NOTIFICATION_RESYNC_SECONDS > 0 and last_id and loop.time() >= next_resync:
+                        next_resync = loop.time() + NOTIFICATION_RESYNC_SECONDS
+                        for missed in await find_notifications_after(db, query, last_id):
+                            yield notification_event(missed)
+                            last_id = missed["_id"]
+                    yield ": keepalive\n\n"
+                    continue
+                
+                # Already sent by the catch-up or a resync
+                if last_id and notification["_id"] <= last_id:
+                    continue
+                yield notification_event(notification)
+                last_id = notification["_id"]
+        finally:
+            notification_hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 
@@ -561,6 +1058,7 @@ async def send_notification(notif: NotificationCreate):
     }
     
     await db.notifications.insert_one(notif_doc)
+    notification_hub.publish(notif_doc)
     
     return {"message": "Notification sent"}
 
@@ -572,13 +1070,37 @@ class VerifySignatureRequest(BaseModel):
     signature: str
     public_key: str
 
+class VerifySignaturesRequest(BaseModel):
+    signatures: List[VerifySignatureRequest] = Field(..., max_length=1000)
+
 class HashRequest(BaseModel):
     data: str
 
 @api_router.post("/crypto/verify-signature")
 async def verify_tx_signature(request: VerifySignatureRequest):
     """Verify ECDSA signature"""
-    valid = verify_signature(request.message, request.signature, request.public_key)
+    valid = await signature_verifier.verify(request.message, request.signature, request.public_key)
+    return {"valid": valid}
+
+
+@api_router.post("/crypto/verify-signatures")
+async def verify_tx_signatures(request: VerifySignaturesRequest):
+    """Verify a batch of ECDSA signatures; results are in request order"""
+    results = await signature_verifier.verify_batch(
+        [(item.message, item.signature, item.public_key) for item in request.signatures]
+    )
+    return {"results": results, "valid_count": sum(results)}
+
+
+@api_router.post("/crypto/verify-proof")
+async def verify_merkle_proof(request: MerkleProofVerifyRequest):
+    """Verify a merkle inclusion proof against a block's merkle root"""
+    valid = verify_proof(
+        request.tx_hash,
+        [step.model_dump() for step in request.proof],
+        request.merkle_root,
+        request.merkle_version
+    )
     return {"valid": valid}
 
 
@@ -591,21 +1113,28 @@ async def compute_hash(request: HashRequest):
 
 @api_router.get("/stats", response_model=StatsResponse)
 async def get_stats():
-    """Get platform statistics"""
-    total_users = await db.users.count_documents({})
-    total_blocks = await db.blocks.count_documents({})
-    total_transactions = await db.transactions.count_documents({})
-    
-    recent_txs = await db.transactions.find({}, {"_id": 0}).sort("timestamp", -1).limit(5).to_list(None)
+    """Get platform statistics (maintained counters, cached recent transactions)"""
+    counters = await get_counters(db)
+    recent_txs = await get_recent_transactions(db)
     
     return StatsResponse(
-        total_users=total_users,
-        total_blocks=total_blocks,
-        total_transactions=total_transactions,
+        total_users=counters["users"],
+        total_blocks=counters["blocks"],
+        total_transactions=counters["transactions"],
         recent_transactions=[Transaction(**tx) for tx in recent_txs]
     )
 
 
+@api_router.get("/health")
+async def health_check():
+    """Service health, including any required indexes that are missing"""
+    indexes = await index_manager.status()
+    return {
+        "status": "ok" if indexes["ok"] else "degraded",
+        "indexes": indexes
+    }
+
+
 @api_router.get("/")
 async def root():
     return {"message": "Bank Blockchain API is running"}
@@ -705,36 +1234,70 @@ async def get_spending_analytics(current_user: User = Depends(get_current_user))
     wallets = await db.wallets.find({"user_id": current_user.user_id}).to_list(None)
     wallet_addresses = [w["wallet_address"] for w in wallets]
     
-    sent_txs = await db.transactions.find({
-        "sender_wallet": {"$in": wallet_addresses},
-        "status": "confirmed"
-    }).to_list(None)
-    
-    received_txs = await db.transactions.find({
-        "receiver_wallet": {"$in": wallet_addresses},
-        "status": "confirmed"
-    }).to_list(None)
-    
-    total_sent = sum(tx["amount"] for tx in sent_txs)
-    total_received = sum(tx["amount"] for tx in received_txs)
-    
-    from collections import defaultdict
-    monthly = defaultdict(float)
-    for tx in sent_txs:
-        try:
-            tx_date = datetime.fromisoformat(tx["timestamp"].replace('Z', '+00:00'))
-            month_key = tx_date.strftime("%Y-%m")
-            monthly[month_key] += tx["amount"]
-        except:
-            pass
+    # Totals and monthly buckets are computed by MongoDB; only the sums come back
+    pipeline = [
+        {"$match": {
+            "status": TransactionStatus.confirmed.value,
+            "$or": [
+                {"sender_wallet": {"$in": wallet_addresses}},
+                {"receiver_wallet": {"$in": wallet_addresses}}
+            ]
+        }},
+        {"$addFields": {
+            "is_sent": {"$in": ["$sender_wallet", wallet_addresses]},
+            "is_received": {"$in": ["$receiver_wallet", wallet_addresses]}
+        }},
+        {"$facet": {
+            "totals": [
+                {"$group": {
+                    "_id": None,
+                    "total_sent": {"$sum": {"$cond": ["$is_sent", "$amount", 0]}},
+                    "total_received": {"$sum": {"$cond": ["$is_received", "$amount", 0]}},
+                    "sent_count": {"$sum": {"$cond": ["$is_sent", 1, 0]}},
+                    "received_count": {"$sum": {"$cond": ["$is_received", 1, 0]}}
+                }}
+            ],
+            "monthly": [
+                {"$match": {"is_sent": True}},
+                # Bucket by the month written in the timestamp itself, ignoring its offset
+                {"$group": {
+                    "_id": {"$dateTrunc": {
+                        "date": {"$dateFromString": {
+                            "dateString": {"$substrBytes": ["$timestamp", 0, 19]},
+                            "format": "%Y-%m-%dT%H:%M:%S",
+                            "onError": None,
+                            "onNull": None
+                        }},
+                        "unit": "month"
+                    }},
+                    "amount": {"$sum": "$amount"}
+                }},
+                {"$match": {"_id": {"$ne": None}}},
+                {"$sort": {"_id": -1}},
+                {"$limit": 6},
+                {"$sort": {"_id": 1}},
+                {"$project": {
+                    "_id": 0,
+                    "month": {"$dateToString": {"date": "$_id", "format": "%Y-%m"}},
+                    "amount": 1
+                }}
+            ]
+        }}
+    ]
+    
+    result = (await db.transactions.aggregate(pipeline).to_list(1))[0]
+    totals = result["totals"][0] if result["totals"] else {
+        "total_sent": 0.0, "total_received": 0.0, "sent_count": 0, "received_count": 0
+    }
     
-    monthly_spending = [{"month": k, "amount": v} for k, v in sorted(monthly.items())]
+    total_sent = totals["total_sent"]
+    total_received = totals["total_received"]
     
     return {
         "total_sent": total_sent,
         "total_received": total_received,
-        "transaction_count": len(sent_txs) + len(received_txs),
-        "monthly_spending": monthly_spending[-6:],
+        "transaction_count": totals["sent_count"] + totals["received_count"],
+        "monthly_spending": result["monthly"],
         "balance": total_received - total_sent
     }
 
@@ -791,7 +1354,7 @@ async def explain_blockchain():
                 "block_creation": "/app/backend/server.py - POST /api/block/add",
                 "validation": "/app/backend/server.py - GET /api/blockchain/validate",
                 "transaction_hashing": "crypto_utils.py - compute_transaction_hash()",
-                "merkle_tree": "crypto_utils.py - compute_merkle_root()",
+                "merkle_tree": "merkle.py - MerkleTree (version 2, raw-digest pairs) builds new blocks and inclusion proofs; crypto_utils.compute_merkle_root() (version 1) only checks legacy blocks",
                 "signatures": "crypto_utils.py - sign_message() & verify_signature()"
             },
             "5_visible_features": {
@@ -847,6 +1410,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Configure logging
@@ -857,8 +1421,75 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@app.on_event("startup")
+async def backfill_block_link_positions():
+    stamped, unmatched = await backfill_link_positions(db)
+    if stamped:
+        logger.info(f"Stamped merkle positions on the links of {stamped} legacy blocks")
+    if unmatched:
+        logger.warning(f"No transaction order reproduces the merkle root of blocks {unmatched[:20]}")
+
+
+@app.on_event("startup")
+async def create_indexes():
+    created = await index_manager.ensure_indexes()
+    for collection, names in created.items():
+        logger.info(f"Created indexes on {collection}: {', '.join(names)}")
+
+
+@app.on_event("startup")
+async def initialize_wallet_balances():
+    if await ensure_balances_initialized(db):
+        logger.info("wallet_balances built from the ledger")
+
+
+@app.on_event("startup")
+async def initialize_platform_counters():
+    if await ensure_counters_initialized(db):
+        logger.info("Platform counters seeded from collection counts")
+
+
+@app.on_event("startup")
+async def start_block_producer():
+    loaded = await mempool.load(db)
+    logger.info(f"Mempool loaded with {loaded} pending transactions")
+    await block_producer.check_deployment()
+    block_producer.start()
+
+
+@app.on_event("startup")
+async def start_keypair_pool():
+    keypair_pool.start()
+
+
+@app.on_event("shutdown")
+async def stop_block_producer():
+    await block_producer.stop()
+
+
+@app.on_event("shutdown")
+async def stop_validation_pool():
+    shutdown_validation_pool()
+
+
+@app.on_event("shutdown")
+async def stop_signature_verifier():
+    signature_verifier.shutdown()
+
+
+@app.on_event("shutdown")
+async def stop_kdf_executor():
+    kdf_executor.shutdown()
+    signing_keys.clear()
+
+
+@app.on_event("shutdown")
+async def stop_keypair_pool():
+    await keypair_pool.stop()
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    database.close()
 
 app.include_router(api_router)
@@ -0,0 +1,86 @@
+"""
+Auth Cache
+Short-lived cache of decoded JWTs and user records for get_current_user
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+from auth_utils import decode_token
+from cache_utils import LRUCache
+from models import User
+
+
+# How long a user record may be served without re-reading it; 0 disables caching
+AUTH_CACHE_TTL_SECONDS = float(os.environ.get('AUTH_CACHE_TTL_SECONDS', '30'))
+
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', '10000'))
+
+
+class AuthCache:
+    """Decoded token payloads and User records, each bounded in size and age.
+
+    A token is cached no longer than its own expiry, so expired tokens are
+    still rejected on time. Anything that changes a user in this process
+    must call invalidate_user; changes made elsewhere (scripts, other
+    workers) show up once the TTL lapses.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL_SECONDS, maxsize: int = AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.tokens = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.users = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def decode(self, token: str) -> Optional[dict]:
+        """decode_token, remembering valid payloads until the TTL or the token's exp"""
+        if not self.enabled:
+            return decode_token(token)
+
+        payload = self.tokens.get(token)
+        if payload is not None:
+            return payload
+
+        payload = decode_token(token)
+        if payload:
+            ttl = self.ttl
+            if "exp" in payload:
+                ttl = min(ttl, payload["exp"] - time.time())
+            if ttl > 0:
+                self.tokens.set(token, payload, ttl=ttl)
+        return payload
+
+    async def get_user(self, db, user_id: str) -> Optional[User]:
+        """User record by id; unknown users are not cached"""
+        if self.enabled:
+            user = self.users.get(user_id)
+            if user is not None:
+                return user
+
+        user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
+        if not user_doc:
+            return None
+
+        user = User(**user_doc)
+        if self.enabled:
+            self.users.set(user_id, user)
+        return user
+
+    def invalidate_user(self, user_id: str):
+        self.users.pop(user_id)
+
+    def clear(self):
+        self.tokens.clear()
+        self.users.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "tokens": self.tokens.stats(),
+            "users": self.users.stats()
+        }
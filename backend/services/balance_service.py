@@ -0,0 +1,221 @@
+"""
+Wallet Balance Service
+Materialized per-wallet balances, maintained when blocks confirm transactions
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+
+BALANCES_STATE_ID = "wallet_balances"
+
+
+def compute_balance_deltas(transactions: Iterable[Dict]) -> Dict[str, Dict[str, float]]:
+    """Sum received/sent amounts per wallet for a set of confirmed transactions"""
+    deltas: Dict[str, Dict[str, float]] = {}
+
+    for tx in transactions:
+        receiver = deltas.setdefault(tx["receiver_wallet"], {"received": 0.0, "sent": 0.0})
+        receiver["received"] += tx["amount"]
+
+        sender = deltas.setdefault(tx["sender_wallet"], {"received": 0.0, "sent": 0.0})
+        sender["sent"] += tx["amount"]
+
+    return deltas
+
+
+async def apply_confirmed_transactions(db, transactions: List[Dict],
+                                       block_number: Optional[int] = None,
+                                       session=None) -> int:
+    """Apply newly confirmed transactions to wallet_balances (one $inc per wallet).
+
+    Every update also bumps the row's revision, which rebuild_balances uses
+    to detect rows that changed while it was summing the ledger. Callers
+    should confirm the transactions in the same MongoDB transaction
+    (``session``), so the ledger and the balance change become visible
+    together.
+    """
+    deltas = compute_balance_deltas(transactions)
+    if not deltas:
+        return 0
+
+    updated_at = datetime.now(timezone.utc).isoformat()
+    operations = []
+    for address, delta in deltas.items():
+        update = {
+            "$inc": {
+                "balance": delta["received"] - delta["sent"],
+                "received": delta["received"],
+                "sent": delta["sent"],
+                "revision": 1
+            },
+            "$set": {"updated_at": updated_at}
+        }
+        if block_number is not None:
+            update["$max"] = {"last_block_number": block_number}
+
+        operations.append(UpdateOne({"wallet_address": address}, update, upsert=True))
+
+    await db.wallet_balances.bulk_write(operations, ordered=False, session=session)
+    return len(operations)
+
+
+async def get_balance(db, address: str) -> float:
+    """Read a wallet's confirmed balance (single indexed lookup)"""
+    doc = await db.wallet_balances.find_one(
+        {"wallet_address": address},
+        {"_id": 0, "balance": 1}
+    )
+    return doc["balance"] if doc else 0.0
+
+
+async def get_balances(db, addresses: Iterable[str]) -> Dict[str, float]:
+    """Confirmed balances for many wallets in one query; wallets with no row read 0.0"""
+    addresses = list(set(addresses))
+    balances = {address: 0.0 for address in addresses}
+    async for doc in db.wallet_balances.find(
+        {"wallet_address": {"$in": addresses}},
+        {"_id": 0, "wallet_address": 1, "balance": 1}
+    ):
+        balances[doc["wallet_address"]] = doc["balance"]
+    return balances
+
+
+async def compute_ledger_balance(db, address: str) -> Dict[str, float]:
+    """Recompute one wallet's received/sent totals from confirmed transactions on the server"""
+    pipeline = [
+        {"$match": {
+            "status": "confirmed",
+            "$or": [{"sender_wallet": address}, {"receiver_wallet": address}]
+        }},
+        {"$group": {
+            "_id": None,
+            "received": {"$sum": {"$cond": [{"$eq": ["$receiver_wallet", address]}, "$amount", 0]}},
+            "sent": {"$sum": {"$cond": [{"$eq": ["$sender_wallet", address]}, "$amount", 0]}}
+        }}
+    ]
+
+    rows = await db.transactions.aggregate(pipeline).to_list(1)
+    if not rows:
+        return {"received": 0.0, "sent": 0.0, "balance": 0.0}
+
+    received, sent = rows[0]["received"], rows[0]["sent"]
+    return {"received": received, "sent": sent, "balance": received - sent}
+
+
+async def compute_ledger_balances(db) -> Dict[str, Dict[str, float]]:
+    """Recompute received/sent totals for every wallet from confirmed transactions.
+
+    Funding transactions are confirmed without being linked to a block, so the
+    ledger of confirmed transactions (not block links) is the source of truth.
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+
+    for field, key in (("receiver_wallet", "received"), ("sender_wallet", "sent")):
+        pipeline = [
+            {"$match": {"status": "confirmed"}},
+            {"$group": {"_id": f"${field}", "total": {"$sum": "$amount"}}}
+        ]
+        async for row in db.transactions.aggregate(pipeline, allowDiskUse=True):
+            entry = totals.setdefault(row["_id"], {"received": 0.0, "sent": 0.0})
+            entry[key] = row["total"]
+
+    return totals
+
+
+async def rebuild_balances(db, dry_run: bool = False) -> Dict:
+    """Reconcile wallet_balances against the ledger.
+
+    Reports every wallet whose stored balance drifted from the recomputed one,
+    and rewrites the table unless ``dry_run`` is set.
+
+    The table is read before the ledger is summed, and each rewrite is
+    conditional on the row's revision being unchanged since then. A row
+    that apply_confirmed_transactions touched mid-rebuild (a block commit
+    or a funding, from any process) is left alone, keeping that $inc, and
+    reported in ``skipped`` for a later run. Pause this process's block
+    producer around the call to keep that list short.
+    """
+    stored = {}
+    async for doc in db.wallet_balances.find({}, {"_id": 0}):
+        stored[doc["wallet_address"]] = doc
+
+    def unchanged(address: str) -> Dict:
+        # {"revision": None} also matches rows written before revisions existed, or no row at all
+        return {"wallet_address": address, "revision": stored.get(address, {}).get("revision")}
+
+    totals = await compute_ledger_balances(db)
+
+    drifted = []
+    for address in set(totals) | set(stored):
+        expected = totals.get(address, {"received": 0.0, "sent": 0.0})
+        expected_balance = expected["received"] - expected["sent"]
+        current_balance = stored.get(address, {}).get("balance")
+
+        if current_balance is None or abs(current_balance - expected_balance) > 1e-9:
+            drifted.append({
+                "wallet_address": address,
+                "stored": current_balance,
+                "expected": expected_balance
+            })
+
+    skipped = []
+    if not dry_run:
+        rebuilt_at = datetime.now(timezone.utc).isoformat()
+        addresses = list(totals)
+        operations = []
+        for address in addresses:
+            expected = totals[address]
+            previous = stored.get(address, {})
+            replacement = {
+                "wallet_address": address,
+                "balance": expected["received"] - expected["sent"],
+                "received": expected["received"],
+                "sent": expected["sent"],
+                "revision": previous.get("revision", 0) + 1,
+                "updated_at": rebuilt_at
+            }
+            if "last_block_number" in previous:
+                replacement["last_block_number"] = previous["last_block_number"]
+            # A row changed since the read fails the filter, so the upsert hits the unique wallet_address index
+            operations.append(ReplaceOne(unchanged(address), replacement, upsert=True))
+
+        if operations:
+            try:
+                await db.wallet_balances.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                skipped = [addresses[error["index"]] for error in errors]
+
+        # Wallets that no longer appear in the ledger
+        orphaned = [address for address in stored if address not in totals]
+        if orphaned:
+            await db.wallet_balances.delete_many({"$or": [unchanged(address) for address in orphaned]})
+
+        await db.system_state.update_one(
+            {"_id": BALANCES_STATE_ID},
+            {"$set": {"rebuilt_at": rebuilt_at, "wallets": len(totals), "skipped": len(skipped)}},
+            upsert=True
+        )
+
+    return {
+        "wallets": len(totals),
+        "drifted": drifted,
+        "skipped": skipped,
+        "dry_run": dry_run
+    }
+
+
+async def ensure_balances_initialized(db) -> bool:
+    """Build wallet_balances from the ledger the first time the app starts against a database"""
+    state = await db.system_state.find_one({"_id": BALANCES_STATE_ID})
+    if state:
+        return False
+
+    await rebuild_balances(db)
+    return True
@@ -0,0 +1,162 @@
+"""
+Block Producer
+Background task that seals pending transactions into blocks on size/age thresholds
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Optional
+
+from models import BlockProducerSettings, BlockProducerStats
+from services.blockchain_service import (
+    BlockchainService, BlockCommitError, TransactionsUnsupportedError,
+    TRANSACTIONS_REQUIRED_MESSAGE, supports_transactions
+)
+from services.mempool import Mempool
+
+logger = logging.getLogger(__name__)
+
+
+def load_settings() -> BlockProducerSettings:
+    """Producer settings from the environment"""
+    return BlockProducerSettings(
+        enabled=os.environ.get('BLOCK_PRODUCER_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        max_transactions=int(os.environ.get('BLOCK_MAX_TRANSACTIONS', '500')),
+        max_bytes=int(os.environ.get('BLOCK_MAX_BYTES', '1000000')),
+        max_age_seconds=float(os.environ.get('BLOCK_MAX_AGE_SECONDS', '30')),
+        poll_interval_seconds=float(os.environ.get('BLOCK_PRODUCER_INTERVAL_SECONDS', '2')),
+        validator=os.environ.get('BLOCK_PRODUCER_VALIDATOR', 'block-producer')
+    )
+
+
+def _age_seconds(timestamp: str, now: datetime) -> float:
+    try:
+        created = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return 0.0
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return (now - created).total_seconds()
+
+
+class BlockProducer:
+    """Seals a block when the mempool reaches max_transactions or max_bytes,
+    or when its oldest transaction is older than max_age_seconds.
+    """
+
+    def __init__(self, db, mempool: Mempool, settings: Optional[BlockProducerSettings] = None):
+        self.db = db
+        self.mempool = mempool
+        self.settings = settings or load_settings()
+        self.stats = BlockProducerStats()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def _trigger(self) -> Optional[str]:
+        """Which threshold the pending pool has reached, if any"""
+        count, size = self.mempool.available()
+        if count == 0:
+            return None
+        if count >= self.settings.max_transactions:
+            return "count"
+        if size >= self.settings.max_bytes:
+            return "bytes"
+
+        oldest = self.mempool.oldest()
+        if _age_seconds(oldest["timestamp"], datetime.now(timezone.utc)) >= self.settings.max_age_seconds:
+            return "age"
+        return None
+
+    async def produce(self, force: bool = False, validator: Optional[str] = None) -> Optional[Dict]:
+        """Seal one block if a threshold is met (or unconditionally with force)"""
+        async with self._lock:
+            self.stats.runs += 1
+            self.stats.last_run_at = datetime.now(timezone.utc).isoformat()
+
+            trigger = self._trigger()
+            if trigger is None:
+                if not force or not len(self.mempool):
+                    return None
+                trigger = "manual"
+
+            batch = self.mempool.reserve(self.settings.max_transactions, self.settings.max_bytes)
+            if not batch:
+                return None
+
+            batch_bytes = self.mempool.bytes_of(batch)
+            started = time.perf_counter()
+            try:
+                block_doc = await BlockchainService.commit_block(
+                    self.db, batch, validator or self.settings.validator
+                )
+            except Exception:
+                await self.mempool.reconcile(self.db, batch)
+                raise
+            self.mempool.remove(batch)
+
+            self.stats.blocks_produced += 1
+            self.stats.transactions_confirmed += len(batch)
+            self.stats.last_block_number = block_doc["block_number"]
+            self.stats.last_block_size = len(batch)
+            self.stats.last_block_bytes = batch_bytes
+            self.stats.last_trigger = trigger
+            self.stats.last_commit_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.stats.last_error = None
+
+            return {**block_doc, "transaction_count": len(batch)}
+
+    @asynccontextmanager
+    async def paused(self) -> AsyncIterator[None]:
+        """Hold off block commits in this process (the producer and /block/add) for the duration"""
+        async with self._lock:
+            yield
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.settings.poll_interval_seconds)
+            if not self.settings.enabled:
+                continue
+            try:
+                # Keep sealing while a burst leaves full blocks' worth pending
+                while await self.produce():
+                    pass
+            except TransactionsUnsupportedError as e:
+                self.disable(str(e))
+            except BlockCommitError as e:
+                # Another worker committed first; retry on the next tick
+                self.stats.last_error = str(e)
+            except Exception as e:
+                self.stats.last_error = str(e)
+                logger.exception("Block producer run failed")
+
+    def disable(self, reason: str):
+        """Stop producing until re-enabled through PUT /admin/block-producer"""
+        self.settings.enabled = False
+        self.stats.last_error = reason
+        logger.error(f"Block producer disabled: {reason}")
+
+    async def check_deployment(self) -> bool:
+        """Disable the producer up front on a deployment without transactions"""
+        if self.settings.enabled and not await supports_transactions(self.db):
+            self.disable(TRANSACTIONS_REQUIRED_MESSAGE)
+            return False
+        return True
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            self.stats.running = True
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.stats.running = False
@@ -7,6 +7,31 @@ from datetime import datetime, timezone
 from typing import List, Dict
 import uuid
 
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+
+# IllegalOperation: "Transaction numbers are only allowed on a replica set member or mongos"
+ILLEGAL_OPERATION_CODE = 20
+
+TRANSACTIONS_REQUIRED_MESSAGE = (
+    "Block commits need MongoDB multi-document transactions: run mongod as a "
+    "replica set (a single-node one is enough, e.g. --replSet rs0) or use Atlas"
+)
+
+
+class BlockCommitError(Exception):
+    """Raised when a block cannot be committed; nothing from it was written"""
+
+
+class TransactionsUnsupportedError(BlockCommitError):
+    """Raised when the server is a standalone mongod, which has no transactions"""
+
+
+async def supports_transactions(db) -> bool:
+    """Whether the deployment is a replica set member or mongos"""
+    hello = await db.command("hello")
+    return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+
 
 class BlockchainService:
     """
@@ -47,9 +72,99 @@ class BlockchainService:
         }
     
     @staticmethod
-    def validate_block(block: Dict, previous_block: Dict = None) -> tuple:
-        """Validate single block integrity"""
-        from crypto_utils import compute_block_hash, compute_merkle_root
+    async def commit_block(db, pending_txs: List[Dict], validator: str) -> Dict:
+        """Write a block, its transaction links, the confirmations and the
+        balance updates in one multi-document transaction.
+
+        Round trips stay constant as the block grows: one insert_many for the
+        links and one update_many for the confirmations. If any transaction
+        was confirmed concurrently, or another block took this block_number,
+        the whole commit is rolled back.
+        """
+        from merkle import MerkleTree
+        from services.balance_service import apply_confirmed_transactions
+        from services.stats_service import increment_counters, invalidate_recent_transactions
+        
+        tx_ids = [tx["tx_id"] for tx in pending_txs]
+        tree = MerkleTree.from_tx_hashes([tx["tx_hash"] for tx in pending_txs])
+        merkle_root = tree.root_hex
+        
+        async def write_block(session) -> Dict:
+            last_block = await db.blocks.find_one(
+                {},
+                {"_id": 0, "block_number": 1, "block_hash": 1},
+                sort=[("block_number", -1)],
+                session=session
+            )
+            
+            if last_block:
+                block_number = last_block["block_number"] + 1
+                previous_hash = last_block["block_hash"]
+            else:
+                block_number = 0
+                previous_hash = "0" * 64
+            
+            # Simple nonce=0 for admin validation
+            timestamp = datetime.now(timezone.utc).isoformat()
+            block_doc = BlockchainService.create_block_metadata(
+                block_number, previous_hash, merkle_root, timestamp, 0, validator
+            )
+            block_doc["merkle_version"] = tree.version
+            
+            await db.blocks.insert_one(block_doc, session=session)
+            
+            # Keep the tree so inclusion proofs never rehash the block
+            await db.merkle_trees.insert_one(
+                {"block_id": block_doc["block_id"], **tree.to_document()},
+                session=session
+            )
+            
+            await db.block_transactions.insert_many([
+                {
+                    "id": str(uuid.uuid4()),
+                    "block_id": block_doc["block_id"],
+                    "tx_id": tx_id,
+                    "position": position
+                }
+                for position, tx_id in enumerate(tx_ids)
+            ], session=session)
+            
+            result = await db.transactions.update_many(
+                {"tx_id": {"$in": tx_ids}, "status": "pending"},
+                {"$set": {"status": "confirmed"}},
+                session=session
+            )
+            if result.modified_count != len(tx_ids):
+                raise BlockCommitError("Some transactions are no longer pending")
+            
+            await apply_confirmed_transactions(
+                db, pending_txs, block_number=block_number, session=session
+            )
+            await increment_counters(db, session=session, blocks=1)
+            
+            block_doc.pop("_id", None)
+            return block_doc
+        
+        try:
+            async with await db.client.start_session() as session:
+                # with_transaction retries transient errors and aborts on anything else
+                block_doc = await session.with_transaction(write_block)
+        except DuplicateKeyError:
+            raise BlockCommitError("Another block was committed concurrently")
+        except OperationFailure as e:
+            if e.code == ILLEGAL_OPERATION_CODE:
+                raise TransactionsUnsupportedError(TRANSACTIONS_REQUIRED_MESSAGE)
+            raise
+        
+        # Recent transactions just changed status
+        invalidate_recent_transactions()
+        return block_doc
+    
+    @staticmethod
+    def validate_block(block: Dict, previous_block: Dict = None, tx_hashes: List[str] = None) -> tuple:
+        """Validate single block integrity (and its merkle root when tx_hashes are given)"""
+        from crypto_utils import compute_block_hash
+        from merkle import merkle_root, LEGACY_MERKLE_VERSION
         
         issues = []
         
@@ -69,6 +184,11 @@ class BlockchainService:
         if computed_hash != block["block_hash"]:
             issues.append(f"Block {block['block_number']}: Invalid block hash")
         
+        # Verify merkle root
+        version = block.get("merkle_version", LEGACY_MERKLE_VERSION)
+        if tx_hashes is not None and merkle_root(tx_hashes, version) != block["merkle_root"]:
+            issues.append(f"Block {block['block_number']}: Invalid merkle root")
+        
         return len(issues) == 0, issues
     
     @staticmethod
@@ -90,7 +210,7 @@ class BlockchainService:
             "technology_used": {
                 "hashing": "SHA-256 (same as Bitcoin)",
                 "signatures": "ECDSA secp256k1 (same as Bitcoin/Ethereum)",
-                "merkle_tree": "Binary tree for transaction verification",
+                "merkle_tree": "Binary SHA-256 tree for transaction verification (merkle.MerkleTree, version 2); version 1 is kept only to verify legacy blocks",
                 "encryption": "AES-256 for private keys"
             },
             "visible_in_ui": {
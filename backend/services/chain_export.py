@@ -0,0 +1,71 @@
+"""
+Chain Export
+Streams the ledger as NDJSON: one block per line with its transactions embedded
+"""
+
+import json
+import os
+import zlib
+from typing import AsyncIterator, Dict, List
+
+from services.chain_validator import load_block_transactions
+
+# Blocks per round of queries (blocks, links, then transactions in bounded chunks)
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+
+async def attach_transactions(db, blocks: List[Dict]):
+    """Embed every block's transactions, in merkle order, for the whole batch"""
+    transactions = await load_block_transactions(db, [block["block_id"] for block in blocks], {"_id": 0})
+    for block in blocks:
+        block["transactions"] = transactions[block["block_id"]]
+
+
+async def iter_export_blocks(db, from_block: int = 0, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Dict]:
+    """Blocks from from_block upward in block_number order, holding one batch in memory at a time"""
+    cursor = db.blocks.find(
+        {"block_number": {"$gte": from_block}}, {"_id": 0}
+    ).sort("block_number", 1).batch_size(batch_size)
+
+    batch: List[Dict] = []
+    async for block in cursor:
+        batch.append(block)
+        if len(batch) >= batch_size:
+            await attach_transactions(db, batch)
+            for exported in batch:
+                yield exported
+            batch = []
+
+    if batch:
+        await attach_transactions(db, batch)
+        for exported in batch:
+            yield exported
+
+
+async def iter_export_lines(db, from_block: int = 0, compress: bool = False,
+                            chunk_bytes: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """NDJSON for iter_export_blocks in chunks of about chunk_bytes, optionally as one gzip stream"""
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    buffer: List[bytes] = []
+    buffered = 0
+
+    def drain() -> bytes:
+        data = b"".join(buffer)
+        buffer.clear()
+        return compressor.compress(data) if compressor else data
+
+    async for block in iter_export_blocks(db, from_block):
+        line = (json.dumps(block, separators=(",", ":"), default=str) + "\n").encode()
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= chunk_bytes:
+            buffered = 0
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+    tail = drain()
+    if compressor is not None:
+        tail += compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,355 @@
+"""
+Chain Validator
+Incremental blockchain validation with a persisted checkpoint, checked in
+parallel block ranges on a process pool
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from merkle import merkle_root, LEGACY_MERKLE_VERSION
+from models import ValidationReport
+from services.blockchain_service import BlockchainService
+
+
+CHECKPOINT_ID = "chain_validation"
+LINK_POSITIONS_ID = "link_positions_backfilled"
+
+# Blocks fetched per round of queries (blocks, links, then transactions in TX_LOOKUP_CHUNK_SIZE chunks)
+FETCH_BATCH_SIZE = int(os.environ.get('VALIDATION_FETCH_BATCH_SIZE', '2000'))
+
+# Most tx_ids in one $in filter; 10k ids keep the query far below MongoDB's 16 MB command limit
+TX_LOOKUP_CHUNK_SIZE = int(os.environ.get('TX_LOOKUP_CHUNK_SIZE', '10000'))
+
+# Blocks per range handed to one worker process
+RANGE_SIZE = int(os.environ.get('VALIDATION_RANGE_SIZE', '250'))
+
+# Below this many blocks a batch is checked inline; pool overhead would dominate
+PARALLEL_THRESHOLD = int(os.environ.get('VALIDATION_PARALLEL_THRESHOLD', '500'))
+
+VALIDATION_WORKERS = int(os.environ.get('VALIDATION_WORKERS', str(os.cpu_count() or 1)))
+
+BLOCK_FIELDS = {
+    "_id": 0, "block_id": 1, "block_number": 1, "previous_hash": 1,
+    "merkle_root": 1, "merkle_version": 1, "timestamp": 1, "nonce": 1, "block_hash": 1
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Validation process pool, created on first use"""
+    global _pool
+    if _pool is None:
+        # spawn: the workers never touch Mongo, and forking a process that
+        # holds MongoClient threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=VALIDATION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the validation pool (app shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def validate_range(blocks: List[Dict], previous_hash: Optional[str]) -> List[str]:
+    """Check a contiguous range of blocks; runs in a worker process.
+
+    Each block carries its tx_hashes. ``previous_hash`` is the stored hash of
+    the block before the range (None at genesis), so ranges are independent.
+    """
+    issues = []
+    previous_block = {"block_hash": previous_hash} if previous_hash is not None else None
+
+    for block in blocks:
+        _, block_issues = BlockchainService.validate_block(block, previous_block, block["tx_hashes"])
+        issues.extend(block_issues)
+        previous_block = block
+
+    return issues
+
+
+def order_links(links: List[Dict]) -> List[Dict]:
+    """A block's block_transactions links in merkle order.
+
+    Links written by commit_block carry the transaction's position in the
+    block. The old add_block hashed its transactions in the order it read
+    them and inserted one link per transaction in that same order, so for
+    its blocks the links' ObjectIds give the merkle order. (The order a
+    tx_id $in query returns transactions in does not: it follows the tx_id
+    index.)
+    """
+    if links and all("position" in link for link in links):
+        return sorted(links, key=lambda link: link["position"])
+    return sorted(links, key=lambda link: link["_id"])
+
+
+async def load_block_links(db, block_ids: List[str]) -> Dict[str, List[Dict]]:
+    """block_id -> links in merkle order, with one query for all the blocks"""
+    links_by_block: Dict[str, List[Dict]] = {block_id: [] for block_id in block_ids}
+    async for link in db.block_transactions.find(
+        {"block_id": {"$in": block_ids}},
+        {"_id": 1, "block_id": 1, "tx_id": 1, "position": 1}
+    ):
+        links_by_block[link["block_id"]].append(link)
+    return {block_id: order_links(links) for block_id, links in links_by_block.items()}
+
+
+async def find_transactions_by_ids(db, tx_ids: List[str], projection: Dict,
+                                   chunk_size: int = TX_LOOKUP_CHUNK_SIZE) -> AsyncIterator[Dict]:
+    """Transactions with the given tx_ids, queried in bounded $in chunks"""
+    for start in range(0, len(tx_ids), chunk_size):
+        async for tx in db.transactions.find({"tx_id": {"$in": tx_ids[start:start + chunk_size]}}, projection):
+            yield tx
+
+
+async def load_block_transactions(db, block_ids: List[str], projection: Dict) -> Dict[str, List[Dict]]:
+    """block_id -> its transactions in merkle order (projection must keep tx_id)"""
+    links_by_block = await load_block_links(db, block_ids)
+
+    tx_ids = [link["tx_id"] for links in links_by_block.values() for link in links]
+    tx_by_id: Dict[str, Dict] = {}
+    async for tx in find_transactions_by_ids(db, tx_ids, projection):
+        tx_by_id[tx["tx_id"]] = tx
+
+    return {
+        block_id: [tx_by_id[link["tx_id"]] for link in links if link["tx_id"] in tx_by_id]
+        for block_id, links in links_by_block.items()
+    }
+
+
+async def attach_tx_hashes(db, blocks: List[Dict]):
+    """Load every block's transaction hashes for the whole batch"""
+    transactions = await load_block_transactions(
+        db, [block["block_id"] for block in blocks], {"_id": 0, "tx_id": 1, "tx_hash": 1}
+    )
+    for block in blocks:
+        block["tx_hashes"] = [tx["tx_hash"] for tx in transactions[block["block_id"]]]
+
+
+async def backfill_link_positions(db, batch_size: int = FETCH_BATCH_SIZE) -> Tuple[int, List[int]]:
+    """Stamp position on the links of blocks committed before links carried one.
+
+    Runs once per database (recorded in system_state). For each legacy
+    block it tries the link insertion order, then the transactions'
+    insertion order, and only writes positions for an order that
+    reproduces the block's merkle_root. Returns (blocks stamped, block
+    numbers no order matched); the run is repeated on the next start while
+    any are unmatched.
+    """
+    if await db.system_state.find_one({"_id": LINK_POSITIONS_ID}, {"_id": 1}):
+        return 0, []
+
+    block_ids = await db.block_transactions.distinct("block_id", {"position": {"$exists": False}})
+    stamped = 0
+    unmatched: List[int] = []
+
+    for start in range(0, len(block_ids), batch_size):
+        batch = block_ids[start:start + batch_size]
+        blocks = await db.blocks.find({"block_id": {"$in": batch}}, BLOCK_FIELDS).to_list(None)
+        links_by_block = await load_block_links(db, batch)
+
+        tx_ids = [link["tx_id"] for links in links_by_block.values() for link in links]
+        tx_by_id: Dict[str, Dict] = {}
+        async for tx in find_transactions_by_ids(db, tx_ids, {"_id": 1, "tx_id": 1, "tx_hash": 1}):
+            tx_by_id[tx["tx_id"]] = tx
+
+        updates = []
+        for block in blocks:
+            links = [link for link in links_by_block[block["block_id"]] if link["tx_id"] in tx_by_id]
+            candidates = [links, sorted(links, key=lambda link: tx_by_id[link["tx_id"]]["_id"])]
+            version = block.get("merkle_version", LEGACY_MERKLE_VERSION)
+            for ordered in candidates:
+                tx_hashes = [tx_by_id[link["tx_id"]]["tx_hash"] for link in ordered]
+                if merkle_root(tx_hashes, version) == block["merkle_root"]:
+                    updates.extend(
+                        UpdateOne({"_id": link["_id"]}, {"$set": {"position": position}})
+                        for position, link in enumerate(ordered)
+                    )
+                    stamped += 1
+                    break
+            else:
+                unmatched.append(block["block_number"])
+
+        if updates:
+            await db.block_transactions.bulk_write(updates, ordered=False)
+
+    if not unmatched:
+        await db.system_state.update_one(
+            {"_id": LINK_POSITIONS_ID},
+            {"$set": {"completed_at": datetime.now(timezone.utc).isoformat(), "blocks": stamped}},
+            upsert=True
+        )
+    return stamped, sorted(unmatched)
+
+
+async def iter_block_batches(db, query: Dict, batch_size: int = FETCH_BATCH_SIZE) -> AsyncIterator[List[Dict]]:
+    """Blocks in block_number order, in batches with tx_hashes attached"""
+    batch: List[Dict] = []
+    cursor = db.blocks.find(query, BLOCK_FIELDS).sort("block_number", 1).batch_size(batch_size)
+
+    async for block in cursor:
+        batch.append(block)
+        if len(batch) >= batch_size:
+            await attach_tx_hashes(db, batch)
+            yield batch
+            batch = []
+
+    if batch:
+        await attach_tx_hashes(db, batch)
+        yield batch
+
+
+async def check_batch(blocks: List[Dict], previous_hash: Optional[str]) -> List[str]:
+    """Check a batch, split into ranges across the process pool when it is large"""
+    if len(blocks) < PARALLEL_THRESHOLD or VALIDATION_WORKERS <= 1:
+        # Routine incremental runs land here; hash on a thread so the event loop keeps serving
+        return await asyncio.to_thread(validate_range, blocks, previous_hash)
+
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    futures = []
+    for start in range(0, len(blocks), RANGE_SIZE):
+        boundary = previous_hash if start == 0 else blocks[start - 1]["block_hash"]
+        futures.append(loop.run_in_executor(
+            pool, validate_range, blocks[start:start + RANGE_SIZE], boundary
+        ))
+
+    issues = []
+    for range_issues in await asyncio.gather(*futures):
+        issues.extend(range_issues)
+    return issues
+
+
+async def get_checkpoint(db) -> Optional[Dict]:
+    return await db.system_state.find_one({"_id": CHECKPOINT_ID})
+
+
+async def save_checkpoint(db, block: Dict):
+    await db.system_state.update_one(
+        {"_id": CHECKPOINT_ID},
+        {"$set": {
+            "block_number": block["block_number"],
+            "block_hash": block["block_hash"],
+            "validated_at": datetime.now(timezone.utc).isoformat()
+        }},
+        upsert=True
+    )
+
+
+async def iter_validation(db, full: bool = False) -> AsyncIterator[Dict]:
+    """Validate blocks added since the last checkpoint, or the whole chain with full=True.
+
+    Yields events as the run goes: ``issue`` for every problem found,
+    ``progress`` after every checked batch, and a final ``report`` holding
+    the ValidationReport. An incremental run re-hashes the checkpointed
+    block, checks it still matches the checkpoint, and checks that the first
+    new block links to it. The checkpoint only advances when a run completes
+    with no issues; a full audit that finds issues clears it. Closing the
+    generator early cancels the in-flight batch and leaves the checkpoint
+    untouched.
+    """
+    issues = []
+    checkpoint = None if full else await get_checkpoint(db)
+    started = time.perf_counter()
+
+    query = {}
+    previous_hash = None
+    if checkpoint:
+        anchor = await db.blocks.find_one({"block_number": checkpoint["block_number"]}, {"_id": 0})
+        if not anchor or anchor["block_hash"] != checkpoint["block_hash"]:
+            anchor_issues = [f"Block {checkpoint['block_number']}: Does not match validation checkpoint"]
+        else:
+            _, anchor_issues = BlockchainService.validate_block(anchor)
+        for issue in anchor_issues:
+            issues.append(issue)
+            yield {"type": "issue", "issue": issue}
+
+        query = {"block_number": {"$gt": checkpoint["block_number"]}}
+        previous_hash = checkpoint["block_hash"]
+
+    tip = await db.blocks.find_one({}, {"_id": 0, "block_number": 1}, sort=[("block_number", -1)])
+    first = checkpoint["block_number"] + 1 if checkpoint else 0
+    to_check = max(tip["block_number"] + 1 - first, 0) if tip else 0
+
+    def progress(checked: int) -> Dict:
+        elapsed = time.perf_counter() - started
+        return {
+            "type": "progress",
+            "checked_blocks": checked,
+            "total_blocks": to_check,
+            "elapsed_seconds": round(elapsed, 3),
+            "blocks_per_second": round(checked / elapsed, 1) if elapsed > 0 else None
+        }
+
+    checked = 0
+    last_block = None
+    in_flight = None
+    in_flight_size = 0
+    try:
+        async for blocks in iter_block_batches(db, query):
+            # Check this batch on the pool while the next one is being fetched
+            task = asyncio.ensure_future(check_batch(blocks, previous_hash))
+            if in_flight is not None:
+                for issue in await in_flight:
+                    issues.append(issue)
+                    yield {"type": "issue", "issue": issue}
+                checked += in_flight_size
+                yield progress(checked)
+            in_flight, in_flight_size = task, len(blocks)
+
+            previous_hash = blocks[-1]["block_hash"]
+            last_block = blocks[-1]
+
+        if in_flight is not None:
+            for issue in await in_flight:
+                issues.append(issue)
+                yield {"type": "issue", "issue": issue}
+            checked += in_flight_size
+            in_flight = None
+            yield progress(checked)
+    finally:
+        if in_flight is not None:
+            in_flight.cancel()
+
+    if not issues and last_block:
+        await save_checkpoint(db, last_block)
+    elif issues and full:
+        await db.system_state.delete_one({"_id": CHECKPOINT_ID})
+
+    if last_block:
+        total_blocks = last_block["block_number"] + 1
+    elif checkpoint:
+        total_blocks = checkpoint["block_number"] + 1
+    else:
+        total_blocks = 0
+
+    report = ValidationReport(
+        valid=len(issues) == 0,
+        total_blocks=total_blocks,
+        issues=issues,
+        full=checkpoint is None,
+        checked_blocks=checked,
+        checkpoint_block=checkpoint["block_number"] if checkpoint else None
+    )
+    yield {"type": "report", "report": report.model_dump()}
+
+
+async def validate_chain(db, full: bool = False) -> ValidationReport:
+    """Run iter_validation to completion and return its report"""
+    async for event in iter_validation(db, full=full):
+        if event["type"] == "report":
+            return ValidationReport(**event["report"])
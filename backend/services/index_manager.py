@@ -0,0 +1,157 @@
+"""
+Index Manager
+Declares the indexes the API relies on and creates them on startup
+"""
+
+import logging
+import os
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from cache_utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds the index status served by /health is reused before index_information runs again
+INDEX_STATUS_TTL_SECONDS = float(os.environ.get('INDEX_STATUS_TTL_SECONDS', '30'))
+
+DUPLICATE_KEY_CODES = (11000, 11001)
+
+
+# collection -> indexes the queries in server.py need
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    "wallets": [
+        IndexModel([("wallet_address", ASCENDING)], name="wallet_address_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "wallet_balances": [
+        IndexModel([("wallet_address", ASCENDING)], name="wallet_address_unique", unique=True),
+    ],
+    "transactions": [
+        IndexModel([("tx_id", ASCENDING)], name="tx_id_unique", unique=True),
+        IndexModel([("tx_hash", ASCENDING)], name="tx_hash_unique", unique=True),
+        IndexModel([("sender_wallet", ASCENDING), ("status", ASCENDING)], name="sender_status"),
+        IndexModel([("receiver_wallet", ASCENDING), ("status", ASCENDING)], name="receiver_status"),
+        IndexModel([("status", ASCENDING), ("timestamp", ASCENDING)], name="status_timestamp"),
+        IndexModel([("timestamp", DESCENDING)], name="timestamp_desc"),
+        # Keyset pagination of wallet / user history: each $or branch scans one of these
+        IndexModel([("sender_wallet", ASCENDING), ("timestamp", DESCENDING), ("tx_id", DESCENDING)],
+                   name="sender_timestamp_tx_id"),
+        IndexModel([("receiver_wallet", ASCENDING), ("timestamp", DESCENDING), ("tx_id", DESCENDING)],
+                   name="receiver_timestamp_tx_id"),
+    ],
+    "blocks": [
+        IndexModel([("block_number", ASCENDING)], name="block_number_unique", unique=True),
+        IndexModel([("block_id", ASCENDING)], name="block_id_unique", unique=True),
+    ],
+    "merkle_trees": [
+        IndexModel([("block_id", ASCENDING)], name="block_id_unique", unique=True),
+    ],
+    "block_transactions": [
+        IndexModel([("block_id", ASCENDING)], name="block_id"),
+        IndexModel([("tx_id", ASCENDING)], name="tx_id"),
+    ],
+    "notifications": [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_timestamp"),
+        # Stream catch-up after Last-Event-ID
+        IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)], name="user_id_oid"),
+    ],
+}
+
+
+def _normalize_key(key) -> tuple:
+    """Key pattern as a comparable tuple; index_information may report 1.0 for 1"""
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in (key.items() if hasattr(key, "items") else key)
+    )
+
+
+def _key_of(spec: Dict) -> tuple:
+    return _normalize_key(spec["key"])
+
+
+def _failure_reason(error: OperationFailure) -> str:
+    """Fixed description of a failed build; the server's message can quote document values"""
+    if error.code in DUPLICATE_KEY_CODES:
+        return "duplicate values"
+    return f"index build failed (code {error.code})"
+
+
+class IndexManager:
+    """Creates REQUIRED_INDEXES idempotently and reports which ones are missing"""
+
+    def __init__(self, db, required: Dict[str, List[IndexModel]] = None):
+        self.db = db
+        self.required = required if required is not None else REQUIRED_INDEXES
+        self.failures: Dict[str, str] = {}
+        self._status = LRUCache(maxsize=1, ttl=INDEX_STATUS_TTL_SECONDS)
+
+    async def _existing_keys(self, collection: str) -> Dict[tuple, Dict]:
+        info = await self.db[collection].index_information()
+        return {_normalize_key(index["key"]): index for index in info.values()}
+
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        """Create every missing index; an index on the same keys under another name counts as present"""
+        created: Dict[str, List[str]] = {}
+        self.failures = {}
+        self._status.clear()
+
+        for collection, indexes in self.required.items():
+            existing = await self._existing_keys(collection)
+
+            for index in indexes:
+                spec = index.document
+                if _key_of(spec) in existing:
+                    continue
+
+                try:
+                    await self.db[collection].create_indexes([index])
+                    created.setdefault(collection, []).append(spec["name"])
+                except OperationFailure as e:
+                    # e.g. duplicate values blocking a unique index - keep starting, report it.
+                    # The full message (which may include the duplicate key) only goes to the log.
+                    self.failures[f"{collection}.{spec['name']}"] = _failure_reason(e)
+                    logger.error(f"Could not create index {collection}.{spec['name']}: {e}")
+
+        return created
+
+    async def missing_indexes(self) -> List[Dict]:
+        """Required indexes that do not exist (or exist without the required uniqueness)"""
+        missing = []
+
+        for collection, indexes in self.required.items():
+            existing = await self._existing_keys(collection)
+
+            for index in indexes:
+                spec = index.document
+                current = existing.get(_key_of(spec))
+                if current is None or (spec.get("unique") and not current.get("unique")):
+                    missing.append({
+                        "collection": collection,
+                        "name": spec["name"],
+                        "keys": [list(k) for k in _key_of(spec)],
+                        "unique": bool(spec.get("unique")),
+                        "error": self.failures.get(f"{collection}.{spec['name']}")
+                    })
+
+        return missing
+
+    async def status(self) -> Dict:
+        """Summary for the health endpoint, cached for INDEX_STATUS_TTL_SECONDS"""
+        status = self._status.get("status")
+        if status is None:
+            missing = await self.missing_indexes()
+            status = {
+                "ok": not missing,
+                "required": sum(len(indexes) for indexes in self.required.values()),
+                "missing": missing
+            }
+            self._status.set("status", status)
+        return status
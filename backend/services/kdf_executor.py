@@ -0,0 +1,123 @@
+"""
+KDF Executor
+Bounded thread pool for key-stretching work (bcrypt, PBKDF2) with admission control
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+# Key-stretching calls running at once
+KDF_MAX_CONCURRENCY = int(os.environ.get('KDF_MAX_CONCURRENCY', str(os.cpu_count() or 1)))
+
+# Calls allowed to wait for a worker; beyond this new calls are rejected
+KDF_MAX_QUEUE = int(os.environ.get('KDF_MAX_QUEUE', '64'))
+
+
+class KdfQueueFullError(Exception):
+    """Raised when the KDF executor's queue is full; the call was not run"""
+
+
+class _OperationStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def to_dict(self) -> Dict:
+        completed = self.calls or 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds / completed * 1000, 2),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            "avg_run_ms": round(self.run_seconds / completed * 1000, 2),
+            "max_run_ms": round(self.max_run_seconds * 1000, 2)
+        }
+
+
+class KdfExecutor:
+    """Runs bcrypt/PBKDF2 off the event loop on at most max_concurrency threads.
+
+    Up to max_queue further calls wait for a worker; once that many are
+    waiting, run() raises KdfQueueFullError immediately so a login storm is
+    shed instead of piling up behind the pool. Wait and run times are
+    tracked per operation.
+    """
+
+    def __init__(self, max_concurrency: int = KDF_MAX_CONCURRENCY, max_queue: int = KDF_MAX_QUEUE):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.operations: Dict[str, _OperationStats] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="kdf"
+            )
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        return max(self.in_flight - self.max_concurrency, 0)
+
+    async def run(self, fn: Callable[..., Any], *args, operation: Optional[str] = None) -> Any:
+        """Call fn(*args) on the pool; raises KdfQueueFullError when saturated"""
+        stats = self.operations.setdefault(operation or fn.__name__, _OperationStats())
+        if self.in_flight >= self.max_concurrency + self.max_queue:
+            stats.rejected += 1
+            raise KdfQueueFullError("Key derivation queue is full")
+
+        submitted = time.perf_counter()
+        timings = {}
+
+        def timed():
+            timings["started"] = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings["finished"] = time.perf_counter()
+
+        def done(future):
+            # The slot is held until the worker finishes, even if the caller went away
+            self.in_flight -= 1
+            if "started" not in timings:
+                return
+            wait = timings["started"] - submitted
+            run = timings["finished"] - timings["started"]
+            stats.calls += 1
+            stats.errors += future.exception() is not None
+            stats.wait_seconds += wait
+            stats.run_seconds += run
+            stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+            stats.max_run_seconds = max(stats.max_run_seconds, run)
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        future = self._get_executor().submit(timed)
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(done, f))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "operations": {name: op.to_dict() for name, op in self.operations.items()}
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,94 @@
+"""
+Keypair Pool
+Pre-generated, pre-encrypted wallet keypairs so registration skips key generation
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from crypto_utils import generate_keypair, encrypt_private_key
+
+logger = logging.getLogger(__name__)
+
+
+# Keypairs kept ready; 0 disables the pool
+KEYPAIR_POOL_SIZE = int(os.environ.get('KEYPAIR_POOL_SIZE', '64'))
+
+
+def _new_wallet_keys(master_key: str) -> Tuple[str, str]:
+    public_key, private_key = generate_keypair()
+    return public_key, encrypt_private_key(private_key, master_key)
+
+
+class KeypairPool:
+    """(wallet address, encrypted private key) pairs ready for new wallets.
+
+    Keys live only in this process's memory and are encrypted under the
+    master key exactly as register would store them. Taking a pair kicks
+    off a background refill, which generates one pair at a time on a
+    worker thread so it never competes with logins for more than one core.
+    """
+
+    def __init__(self, master_key: str, size: int = KEYPAIR_POOL_SIZE):
+        self.master_key = master_key
+        self.size = max(size, 0)
+        self._ready: Deque[Tuple[str, str]] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self.taken = 0
+        self.misses = 0
+        self.generated = 0
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+    def take(self) -> Optional[Tuple[str, str]]:
+        """A ready (public key, encrypted private key) pair, or None if the pool is empty"""
+        try:
+            pair = self._ready.popleft()
+            self.taken += 1
+        except IndexError:
+            pair = None
+            self.misses += 1
+        self._schedule_refill()
+        return pair
+
+    def _schedule_refill(self):
+        if self.size and len(self._ready) < self.size and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        try:
+            while len(self._ready) < self.size:
+                pair = await asyncio.to_thread(_new_wallet_keys, self.master_key)
+                self._ready.append(pair)
+                self.generated += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Keypair pool refill failed")
+
+    def start(self):
+        self._schedule_refill()
+
+    async def stop(self):
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+        self._ready.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "size": self.size,
+            "ready": len(self._ready),
+            "refilling": self._refill_task is not None and not self._refill_task.done(),
+            "taken": self.taken,
+            "misses": self.misses,
+            "generated": self.generated
+        }
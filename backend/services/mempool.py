@@ -0,0 +1,162 @@
+"""
+Mempool
+In-memory pool of pending transactions, indexed by tx_hash and sender
+"""
+
+import bisect
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import bson
+
+
+def _order_key(tx: Dict) -> Tuple:
+    """Deterministic ordering: timestamp, then nonce, then tx_hash as tie-breaker"""
+    return (tx["timestamp"], tx.get("nonce", 0), tx["tx_hash"])
+
+
+class Mempool:
+    """Pending transactions awaiting a block.
+
+    Loaded from the transactions collection at startup and fed by
+    create_transaction. All methods are synchronous, so each call is atomic
+    with respect to the event loop; reserve() hands out non-overlapping
+    batches until they are removed (committed) or released (commit failed).
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._by_hash: Dict[str, Dict] = {}
+        self._by_sender: Dict[str, Set[str]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._order: List[Tuple] = []
+        self._reserved: Set[str] = set()
+        self.total_bytes = 0
+        self.rejected_duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
+
+    def __contains__(self, tx_hash: str) -> bool:
+        return tx_hash in self._by_hash
+
+    async def load(self, db) -> int:
+        """Rebuild the pool from pending transactions in the database"""
+        self._reset()
+        async for tx in db.transactions.find({"status": "pending"}, {"_id": 0}):
+            self.add(tx)
+        return len(self)
+
+    def add(self, tx: Dict) -> bool:
+        """Add a pending transaction; False if its tx_hash is already pooled"""
+        tx_hash = tx["tx_hash"]
+        if tx_hash in self._by_hash:
+            self.rejected_duplicates += 1
+            return False
+
+        tx = {key: value for key, value in tx.items() if key != "_id"}
+        size = len(bson.encode(tx))
+
+        self._by_hash[tx_hash] = tx
+        self._by_sender.setdefault(tx["sender_wallet"], set()).add(tx_hash)
+        self._sizes[tx_hash] = size
+        self.total_bytes += size
+        bisect.insort(self._order, _order_key(tx))
+        return True
+
+    def get(self, tx_hash: str) -> Optional[Dict]:
+        return self._by_hash.get(tx_hash)
+
+    def by_sender(self, sender_wallet: str) -> List[Dict]:
+        """Pending transactions from one wallet, in pool order"""
+        txs = [self._by_hash[h] for h in self._by_sender.get(sender_wallet, ())]
+        return sorted(txs, key=_order_key)
+
+    def oldest(self) -> Optional[Dict]:
+        """Oldest transaction not already reserved for a block"""
+        for key in self._order:
+            if key[2] not in self._reserved:
+                return self._by_hash[key[2]]
+        return None
+
+    def available(self) -> Tuple[int, int]:
+        """(count, bytes) of transactions not reserved for a block"""
+        reserved_bytes = sum(self._sizes[h] for h in self._reserved)
+        return len(self._by_hash) - len(self._reserved), self.total_bytes - reserved_bytes
+
+    def bytes_of(self, txs: Iterable[Dict]) -> int:
+        """BSON size of pooled transactions"""
+        return sum(self._sizes.get(tx["tx_hash"], 0) for tx in txs)
+
+    def reserve(self, max_transactions: int, max_bytes: int) -> List[Dict]:
+        """Take the oldest unreserved transactions that fit in one block"""
+        batch, size = [], 0
+        for key in self._order:
+            tx_hash = key[2]
+            if tx_hash in self._reserved:
+                continue
+            tx_size = self._sizes[tx_hash]
+            if batch and size + tx_size > max_bytes:
+                break
+            batch.append(self._by_hash[tx_hash])
+            size += tx_size
+            if len(batch) >= max_transactions:
+                break
+
+        self._reserved.update(tx["tx_hash"] for tx in batch)
+        return batch
+
+    def release(self, txs: Iterable[Dict]):
+        """Return reserved transactions to the pool (their block was not committed)"""
+        for tx in txs:
+            self._reserved.discard(tx["tx_hash"])
+
+    def remove(self, txs: Iterable[Dict]):
+        """Drop transactions that left the pending state"""
+        for tx in txs:
+            tx_hash = tx["tx_hash"]
+            pooled = self._by_hash.pop(tx_hash, None)
+            if pooled is None:
+                continue
+
+            self._reserved.discard(tx_hash)
+            self.total_bytes -= self._sizes.pop(tx_hash)
+
+            sender_hashes = self._by_sender.get(pooled["sender_wallet"])
+            if sender_hashes is not None:
+                sender_hashes.discard(tx_hash)
+                if not sender_hashes:
+                    del self._by_sender[pooled["sender_wallet"]]
+
+            key = _order_key(pooled)
+            index = bisect.bisect_left(self._order, key)
+            if index < len(self._order) and self._order[index] == key:
+                del self._order[index]
+
+    async def reconcile(self, db, txs: List[Dict]):
+        """After a failed commit: evict what is no longer pending, release the rest"""
+        tx_ids = [tx["tx_id"] for tx in txs]
+        still_pending = set()
+        async for doc in db.transactions.find(
+            {"tx_id": {"$in": tx_ids}, "status": "pending"},
+            {"_id": 0, "tx_id": 1}
+        ):
+            still_pending.add(doc["tx_id"])
+
+        self.remove(tx for tx in txs if tx["tx_id"] not in still_pending)
+        self.release(tx for tx in txs if tx["tx_id"] in still_pending)
+
+    def stats(self) -> Dict:
+        available_count, available_bytes = self.available()
+        oldest = self.oldest()
+        return {
+            "size": len(self),
+            "bytes": self.total_bytes,
+            "reserved": len(self._reserved),
+            "available": available_count,
+            "available_bytes": available_bytes,
+            "senders": len(self._by_sender),
+            "oldest_timestamp": oldest["timestamp"] if oldest else None,
+            "rejected_duplicates": self.rejected_duplicates
+        }
@@ -0,0 +1,91 @@
+"""
+Merkle Service
+Loads per-block merkle trees (cached in-process) and builds inclusion proofs
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from cache_utils import LRUCache
+from merkle import MerkleTree, LEGACY_MERKLE_VERSION
+from services.chain_validator import attach_tx_hashes
+
+
+logger = logging.getLogger(__name__)
+
+# block_id -> MerkleTree; blocks are immutable so entries never go stale
+tree_cache = LRUCache(maxsize=int(os.environ.get('MERKLE_TREE_CACHE_SIZE', '256')))
+
+
+class MerkleTreeMismatchError(Exception):
+    """Raised when a block's transactions do not hash to its merkle_root"""
+
+
+async def get_block_tree(db, block: Dict) -> MerkleTree:
+    """A block's merkle tree: from the cache, from merkle_trees, or rebuilt once from its transactions.
+
+    Only a tree whose root equals the block's merkle_root is stored or
+    served; MerkleTreeMismatchError otherwise.
+    """
+    block_id = block["block_id"]
+    tree = tree_cache.get(block_id)
+    if tree is not None:
+        return tree
+
+    doc = await db.merkle_trees.find_one({"block_id": block_id}, {"_id": 0})
+    if doc:
+        tree = MerkleTree.from_document(doc)
+        if tree.root_hex != block["merkle_root"]:
+            # Stored by an earlier rebuild that hashed legacy transactions out of order
+            logger.warning(f"Discarding stored merkle tree of block {block['block_number']}: root mismatch")
+            await db.merkle_trees.delete_one({"block_id": block_id})
+            doc = None
+
+    if not doc:
+        # Blocks committed before trees were stored
+        rebuilt = {"block_id": block_id}
+        await attach_tx_hashes(db, [rebuilt])
+        tree = MerkleTree.from_tx_hashes(
+            rebuilt["tx_hashes"],
+            block.get("merkle_version", LEGACY_MERKLE_VERSION)
+        )
+        if tree.root_hex != block["merkle_root"]:
+            raise MerkleTreeMismatchError(f"Block {block['block_number']}: transactions do not match merkle root")
+        try:
+            await db.merkle_trees.insert_one({"block_id": block_id, **tree.to_document()})
+        except DuplicateKeyError:
+            pass
+
+    tree_cache.set(block_id, tree)
+    return tree
+
+
+async def build_inclusion_proof(db, tx: Dict) -> Optional[Dict]:
+    """Inclusion proof for a confirmed transaction, or None if it is not in a block"""
+    link = await db.block_transactions.find_one({"tx_id": tx["tx_id"]}, {"_id": 0, "block_id": 1})
+    if not link:
+        return None
+
+    block = await db.blocks.find_one({"block_id": link["block_id"]}, {"_id": 0})
+    if not block:
+        return None
+
+    tree = await get_block_tree(db, block)
+    index = tree.leaf_index(tx["tx_hash"])
+    if index is None:
+        return None
+
+    return {
+        "tx_id": tx["tx_id"],
+        "tx_hash": tx["tx_hash"],
+        "block_id": block["block_id"],
+        "block_number": block["block_number"],
+        "merkle_root": block["merkle_root"],
+        "merkle_version": tree.version,
+        "leaf_index": index,
+        "leaf_count": tree.leaf_count,
+        "proof": tree.proof(index)
+    }
@@ -0,0 +1,105 @@
+"""
+Notification Hub
+In-process pub/sub that pushes new notifications to open event streams
+"""
+
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from bson import ObjectId
+
+
+# Notifications a slow stream may fall behind by before it is closed (the client reconnects and catches up)
+NOTIFICATION_QUEUE_SIZE = int(os.environ.get('NOTIFICATION_QUEUE_SIZE', '100'))
+
+# Most notifications replayed from the DB after Last-Event-ID
+NOTIFICATION_CATCHUP_LIMIT = int(os.environ.get('NOTIFICATION_CATCHUP_LIMIT', '100'))
+
+
+class Subscription:
+    """One open stream: the channels it listens on and its pending notifications"""
+
+    def __init__(self, channels: Iterable[Optional[str]], maxsize: int):
+        self.channels = set(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+
+class NotificationHub:
+    """Fans notifications out to the streams subscribed to their user_id.
+
+    A channel is a user_id; None is the admin channel (contact messages and
+    other notifications without a user). Publishing never blocks: a stream
+    whose queue is full is marked overflowed and gets nothing further, and
+    its client resumes from the database with Last-Event-ID.
+
+    Only notifications written by this process are pushed. With several
+    workers, streams pick up the others' notifications on resync (see
+    NOTIFICATION_RESYNC_SECONDS in server.py) or on reconnect.
+    """
+
+    def __init__(self, queue_size: int = NOTIFICATION_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[Optional[str], Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, channels: Iterable[Optional[str]]) -> Subscription:
+        subscription = Subscription(channels, self.queue_size)
+        for channel in subscription.channels:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for channel in subscription.channels:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, notification: Dict):
+        """Queue an inserted notification document (with its _id) for its user's streams"""
+        self.published += 1
+        for subscription in list(self._subscribers.get(notification.get("user_id"), ())):
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(notification)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.overflows += 1
+
+    def publish_many(self, notifications: Iterable[Dict]):
+        for notification in notifications:
+            self.publish(notification)
+
+    def stats(self) -> Dict:
+        streams = {id(s) for subscribers in self._subscribers.values() for s in subscribers}
+        return {
+            "streams": len(streams),
+            "channels": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "queue_size": self.queue_size
+        }
+
+
+async def find_notifications_after(db, query: Dict, last_id: ObjectId,
+                                   limit: int = NOTIFICATION_CATCHUP_LIMIT) -> List[Dict]:
+    """Notifications matching query inserted after last_id, oldest first.
+
+    ObjectIds grow with insertion time, so they order the catch-up even
+    where the notification's own timestamp comes from the client.
+    """
+    return await db.notifications.find(
+        {**query, "_id": {"$gt": last_id}}
+    ).sort("_id", 1).limit(limit).to_list(None)
+
+
+# Shared by server.py and the routers that create notifications
+notification_hub = NotificationHub()
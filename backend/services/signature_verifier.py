@@ -0,0 +1,132 @@
+"""
+Signature Verifier
+Runs ECDSA verifies on a worker pool so they never block the event loop
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from crypto_utils import cached_signature_result, verify_signature
+
+
+VERIFY_WORKERS = int(os.environ.get('SIGNATURE_VERIFY_WORKERS', str(os.cpu_count() or 1)))
+
+# Pool jobs (a single verify or a batch chunk) queued or running at once;
+# further callers wait for a slot
+VERIFY_MAX_PENDING = int(os.environ.get('SIGNATURE_VERIFY_MAX_PENDING', '256'))
+
+# Signatures handed to a worker per job in a batch
+VERIFY_CHUNK_SIZE = int(os.environ.get('SIGNATURE_VERIFY_CHUNK_SIZE', '64'))
+
+# (message, signature hex, public key hex)
+SignatureCheck = Tuple[str, str, str]
+
+
+def _verify_chunk(checks: Sequence[SignatureCheck]) -> List[bool]:
+    return [verify_signature(message, signature, public_key) for message, signature, public_key in checks]
+
+
+class SignatureVerifier:
+    """Thread pool for signature checks with a bound on outstanding work.
+
+    Results already in the verification cache are answered inline. Every
+    pool job holds a slot of the pending semaphore from submission until
+    its result is back, so a burst of submits queues on the semaphore
+    rather than growing the executor queue without limit.
+    """
+
+    def __init__(self, workers: int = VERIFY_WORKERS, max_pending: int = VERIFY_MAX_PENDING,
+                 chunk_size: int = VERIFY_CHUNK_SIZE):
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, 1)
+        self.chunk_size = max(chunk_size, 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.pending = 0
+        self.waiting = 0
+        self.verified = 0
+        self.cache_hits = 0
+        self.busy_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="sig-verify"
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def _run(self, checks: Sequence[SignatureCheck]) -> List[bool]:
+        slots = self._get_slots()
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.pending += 1
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), _verify_chunk, checks)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+            self.verified += len(checks)
+            self.pending -= 1
+            slots.release()
+
+    async def verify(self, message: str, signature: str, public_key: str) -> bool:
+        """Check one signature off the event loop"""
+        cached = cached_signature_result(message, signature, public_key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        return (await self._run([(message, signature, public_key)]))[0]
+
+    async def verify_batch(self, checks: Sequence[SignatureCheck]) -> List[bool]:
+        """Check many signatures, spread across the pool in chunks; results keep input order"""
+        results: List[Optional[bool]] = [None] * len(checks)
+        uncached: List[int] = []
+        for i, (message, signature, public_key) in enumerate(checks):
+            cached = cached_signature_result(message, signature, public_key)
+            if cached is None:
+                uncached.append(i)
+            else:
+                results[i] = cached
+        self.cache_hits += len(checks) - len(uncached)
+
+        if uncached:
+            # Small batches still use every worker; large ones cap per-job dispatch overhead
+            chunk_size = min(self.chunk_size, max(-(-len(uncached) // self.workers), 1))
+            chunks = [uncached[i:i + chunk_size] for i in range(0, len(uncached), chunk_size)]
+            chunk_results = await asyncio.gather(*(
+                self._run([checks[i] for i in chunk]) for chunk in chunks
+            ))
+            for chunk, valid in zip(chunks, chunk_results):
+                for i, result in zip(chunk, valid):
+                    results[i] = result
+
+        return results
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "waiting": self.waiting,
+            "verified": self.verified,
+            "cache_hits": self.cache_hits,
+            "busy_seconds": round(self.busy_seconds, 3)
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
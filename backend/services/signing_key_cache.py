@@ -0,0 +1,68 @@
+"""
+Signing Key Cache
+Optional in-memory cache of unlocked wallet private keys for /transaction/sign
+"""
+
+import os
+from typing import Dict, Optional
+
+from cache_utils import LRUCache
+
+
+# Off unless enabled: unlocked keys stay in process memory for up to the TTL
+SIGNING_KEY_CACHE_ENABLED = os.environ.get('SIGNING_KEY_CACHE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+SIGNING_KEY_CACHE_TTL_SECONDS = float(os.environ.get('SIGNING_KEY_CACHE_TTL_SECONDS', '300'))
+
+SIGNING_KEY_CACHE_SIZE = int(os.environ.get('SIGNING_KEY_CACHE_SIZE', '1000'))
+
+
+def zero_key(key: bytearray):
+    """Overwrite an unlocked key in place"""
+    key[:] = bytes(len(key))
+
+
+def _zero_evicted(wallet_address: str, key: bytearray):
+    zero_key(key)
+
+
+class SigningKeyCache:
+    """Raw private keys by wallet address, held as bytearrays.
+
+    Every key is overwritten with zeros when it is evicted, expires, is
+    invalidated or the cache is cleared. This is best effort: the hex
+    string produced while decrypting and the short-lived bytes copy made
+    for each signature are left to the garbage collector.
+    """
+
+    def __init__(self, enabled: bool = SIGNING_KEY_CACHE_ENABLED,
+                 ttl: float = SIGNING_KEY_CACHE_TTL_SECONDS, maxsize: int = SIGNING_KEY_CACHE_SIZE):
+        self.enabled = enabled
+        self.keys = LRUCache(maxsize=maxsize, ttl=ttl, on_evict=_zero_evicted)
+
+    def get(self, wallet_address: str) -> Optional[bytearray]:
+        if not self.enabled:
+            return None
+        # Expired keys are zeroed promptly instead of waiting for a lookup
+        self.keys.purge_expired()
+        return self.keys.get(wallet_address)
+
+    def put(self, wallet_address: str, private_key_hex: str) -> bytearray:
+        """Unlocked key as a bytearray, cached when the cache is enabled.
+
+        With the cache off the caller owns the key and should zero_key it
+        once it has signed.
+        """
+        key = bytearray.fromhex(private_key_hex)
+        if self.enabled:
+            self.keys.set(wallet_address, key)
+        return key
+
+    def invalidate(self, wallet_address: str):
+        self.keys.pop(wallet_address)
+
+    def clear(self):
+        self.keys.clear()
+
+    def stats(self) -> Dict:
+        return {"enabled": self.enabled, **self.keys.stats()}
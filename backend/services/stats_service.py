@@ -0,0 +1,77 @@
+"""
+Stats Service
+Maintained platform counters and a short-lived cache of recent transactions
+"""
+
+import os
+from typing import Dict, List
+
+from cache_utils import LRUCache
+
+
+COUNTERS_ID = "platform_counters"
+COUNTER_FIELDS = ("users", "blocks", "transactions")
+
+# Seconds the recent-transactions list may be served from memory
+RECENT_TRANSACTIONS_TTL_SECONDS = float(os.environ.get('STATS_RECENT_TTL_SECONDS', '5'))
+RECENT_TRANSACTIONS_LIMIT = 5
+
+_recent_transactions = LRUCache(maxsize=1, ttl=RECENT_TRANSACTIONS_TTL_SECONDS)
+
+
+async def increment_counters(db, session=None, **deltas: int):
+    """Add to the platform counters, e.g. increment_counters(db, transactions=3)"""
+    deltas = {field: n for field, n in deltas.items() if n}
+    if not deltas:
+        return
+    await db.system_state.update_one(
+        {"_id": COUNTERS_ID},
+        {"$inc": deltas},
+        upsert=True,
+        session=session
+    )
+
+
+async def get_counters(db) -> Dict[str, int]:
+    """Current counters (one _id lookup)"""
+    doc = await db.system_state.find_one({"_id": COUNTERS_ID}) or {}
+    return {field: doc.get(field, 0) for field in COUNTER_FIELDS}
+
+
+async def rebuild_counters(db) -> Dict[str, int]:
+    """Recount every collection and overwrite the counters"""
+    counters = {
+        "users": await db.users.count_documents({}),
+        "blocks": await db.blocks.count_documents({}),
+        "transactions": await db.transactions.count_documents({})
+    }
+    await db.system_state.update_one({"_id": COUNTERS_ID}, {"$set": {**counters, "seeded": True}}, upsert=True)
+    return counters
+
+
+async def ensure_counters_initialized(db) -> bool:
+    """Seed the counters from full counts the first time the app starts against a database.
+
+    Keyed on the seeded flag rather than the document: a script's
+    increment_counters may have upserted a partial document before the
+    app ever started.
+    """
+    if await db.system_state.find_one({"_id": COUNTERS_ID, "seeded": True}, {"_id": 1}):
+        return False
+    await rebuild_counters(db)
+    return True
+
+
+async def get_recent_transactions(db) -> List[Dict]:
+    """Newest transactions, cached for a few seconds and dropped when a block is committed"""
+    recent = _recent_transactions.get("recent")
+    if recent is None:
+        recent = await db.transactions.find({}, {"_id": 0}).sort("timestamp", -1).limit(
+            RECENT_TRANSACTIONS_LIMIT
+        ).to_list(None)
+        _recent_transactions.set("recent", recent)
+    return recent
+
+
+def invalidate_recent_transactions():
+    _recent_transactions.clear()
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# The backend modules import each other as top-level modules (see server.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# database.py builds its client at import; point it at a local server it never contacts
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
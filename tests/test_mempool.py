@@ -0,0 +1,73 @@
+from services.mempool import Mempool
+
+
+def make_tx(n, timestamp, sender="alice", nonce=0):
+    return {
+        "tx_id": f"id-{n}",
+        "tx_hash": f"{n:064x}",
+        "sender_wallet": sender,
+        "receiver_wallet": "bob",
+        "amount": 1.0,
+        "timestamp": timestamp,
+        "nonce": nonce,
+        "status": "pending"
+    }
+
+
+def hashes(txs):
+    return [tx["tx_hash"] for tx in txs]
+
+
+def test_reserve_orders_by_timestamp_nonce_then_hash():
+    pool = Mempool()
+    late = make_tx(1, "2024-01-03")
+    tie_high_nonce = make_tx(2, "2024-01-02", nonce=5)
+    tie_b = make_tx(4, "2024-01-02", nonce=1)
+    tie_a = make_tx(3, "2024-01-02", nonce=1)
+    early = make_tx(5, "2024-01-01", sender="carol")
+    for tx in (late, tie_high_nonce, tie_b, tie_a, early):
+        assert pool.add(tx)
+
+    assert pool.oldest() == early
+    assert hashes(pool.reserve(10, 10 ** 6)) == hashes([early, tie_a, tie_b, tie_high_nonce, late])
+
+
+def test_duplicates_are_rejected():
+    pool = Mempool()
+    tx = make_tx(1, "2024-01-01")
+    assert pool.add(tx)
+    assert not pool.add(dict(tx, _id="ignored"))
+    assert len(pool) == 1
+    assert pool.rejected_duplicates == 1
+
+
+def test_reserve_respects_count_and_bytes_and_skips_reserved():
+    pool = Mempool()
+    txs = [make_tx(n, f"2024-01-0{n}") for n in range(1, 6)]
+    for tx in txs:
+        pool.add(tx)
+
+    assert hashes(pool.reserve(2, 10 ** 6)) == hashes(txs[:2])
+    one_tx_bytes = pool.bytes_of(txs[2:3])
+    assert hashes(pool.reserve(10, one_tx_bytes)) == hashes(txs[2:3])
+    assert pool.oldest() == txs[3]
+    assert pool.available() == (2, pool.bytes_of(txs[3:]))
+
+
+def test_release_and_remove():
+    pool = Mempool()
+    txs = [make_tx(n, f"2024-01-0{n}") for n in range(1, 4)]
+    for tx in txs:
+        pool.add(tx)
+
+    batch = pool.reserve(2, 10 ** 6)
+    pool.release(batch[1:])
+    pool.remove(batch[:1])
+
+    assert txs[0]["tx_hash"] not in pool
+    assert pool.by_sender("alice") == txs[1:]
+    assert hashes(pool.reserve(10, 10 ** 6)) == hashes(txs[1:])
+    assert pool.total_bytes == pool.bytes_of(txs[1:])
+
+    pool.remove(txs)
+    assert len(pool) == 0 and pool.total_bytes == 0 and pool.oldest() is None
@@ -0,0 +1,90 @@
+import hashlib
+
+import pytest
+
+from crypto_utils import compute_merkle_root
+from merkle import LEGACY_MERKLE_VERSION, MERKLE_VERSION, MerkleTree, merkle_root, verify_proof
+
+VERSIONS = [LEGACY_MERKLE_VERSION, MERKLE_VERSION]
+
+
+def tx_hashes(n):
+    return [hashlib.sha256(f"tx-{i}".encode()).hexdigest() for i in range(n)]
+
+
+@pytest.mark.parametrize("n", range(1, 34))
+def test_version_1_matches_legacy_root(n):
+    hashes = tx_hashes(n)
+    assert MerkleTree.from_tx_hashes(hashes, LEGACY_MERKLE_VERSION).root_hex == compute_merkle_root(hashes)
+    assert merkle_root(hashes, LEGACY_MERKLE_VERSION) == compute_merkle_root(hashes)
+
+
+def test_version_2_hashes_raw_digests():
+    a, b = tx_hashes(2)
+    expected = hashlib.sha256(bytes.fromhex(a) + bytes.fromhex(b)).hexdigest()
+    assert merkle_root([a, b]) == expected
+    assert merkle_root([a, b], LEGACY_MERKLE_VERSION) != expected
+
+
+def test_single_leaf_is_its_own_root():
+    [leaf] = tx_hashes(1)
+    for version in VERSIONS:
+        tree = MerkleTree.from_tx_hashes([leaf], version)
+        assert tree.root_hex == leaf
+        assert tree.proof(0) == []
+
+
+def test_odd_level_pairs_last_node_with_itself():
+    a, b, c = (bytes.fromhex(h) for h in tx_hashes(3))
+    tree = MerkleTree.from_leaves([a, b, c])
+    ab = hashlib.sha256(a + b).digest()
+    cc = hashlib.sha256(c + c).digest()
+    assert tree.root == hashlib.sha256(ab + cc).digest()
+    assert tree.proof(2)[0] == {"hash": c.hex(), "position": "right"}
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+@pytest.mark.parametrize("n", range(1, 34))
+def test_every_proof_round_trips(version, n):
+    hashes = tx_hashes(n)
+    tree = MerkleTree.from_tx_hashes(hashes, version)
+    for index, tx_hash in enumerate(hashes):
+        assert tree.leaf_index(tx_hash) == index
+        assert verify_proof(tx_hash, tree.proof(index), tree.root_hex, version)
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_tampered_proofs_are_rejected(version):
+    hashes = tx_hashes(7)
+    tree = MerkleTree.from_tx_hashes(hashes, version)
+    proof = tree.proof(3)
+
+    assert not verify_proof(tx_hashes(8)[7], proof, tree.root_hex, version)
+    assert not verify_proof(hashes[3], proof, tree.root_hex, MERKLE_VERSION + LEGACY_MERKLE_VERSION - version)
+
+    flipped = [dict(step) for step in proof]
+    flipped[0]["position"] = "left" if flipped[0]["position"] == "right" else "right"
+    assert not verify_proof(hashes[3], flipped, tree.root_hex, version)
+
+    altered = [dict(step) for step in proof]
+    altered[-1]["hash"] = "00" * 32
+    assert not verify_proof(hashes[3], altered, tree.root_hex, version)
+
+    assert not verify_proof(hashes[3], [{"hash": "zz", "position": "left"}], tree.root_hex, version)
+    assert not verify_proof(hashes[3], proof[:-1], tree.root_hex, version)
+
+
+def test_proof_index_out_of_range():
+    tree = MerkleTree.from_tx_hashes(tx_hashes(4))
+    with pytest.raises(IndexError):
+        tree.proof(4)
+    assert tree.leaf_index("ab" * 32) is None
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_document_round_trip(version):
+    tree = MerkleTree.from_tx_hashes(tx_hashes(5), version)
+    restored = MerkleTree.from_document(tree.to_document())
+    assert restored.version == version
+    assert restored.root_hex == tree.root_hex
+    assert restored.proof(4) == tree.proof(4)
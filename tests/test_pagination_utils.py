@@ -0,0 +1,89 @@
+import asyncio
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException, Response
+
+from pagination_utils import (
+    block_cursor, blocks_after, decode_cursor, encode_cursor, transaction_cursor, transactions_after
+)
+
+BRANCHES = [{"sender_wallet": "w"}, {"receiver_wallet": "w"}]
+
+
+def raw_cursor(position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    position = {"ts": "2024-01-01T00:00:00+00:00", "id": "tx-1"}
+    cursor = encode_cursor(position)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, {"ts": str, "id": str}) == position
+
+
+def test_decode_keeps_only_declared_fields():
+    cursor = encode_cursor({"bn": 4, "$where": "sleep(1000)"})
+    assert decode_cursor(cursor, {"bn": int}) == {"bn": 4}
+
+
+def test_transactions_after_cursor():
+    cursor = transaction_cursor({"timestamp": "t5", "tx_id": "b"})
+    assert transactions_after(cursor, BRANCHES) == {
+        "$or": [
+            {"sender_wallet": "w", "timestamp": {"$lte": "t5"}},
+            {"receiver_wallet": "w", "timestamp": {"$lte": "t5"}}
+        ],
+        "$nor": [{"timestamp": "t5", "tx_id": {"$gte": "b"}}]
+    }
+
+
+def test_first_page_has_no_bound():
+    assert transactions_after(None, BRANCHES) == {"$or": BRANCHES}
+    assert transactions_after(None, BRANCHES[:1]) == BRANCHES[0]
+    assert blocks_after(None) == {}
+
+
+def test_blocks_after_cursor():
+    assert blocks_after(block_cursor({"block_number": 7})) == {"block_number": {"$lt": 7}}
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor([1, 2]),
+    raw_cursor({"ts": "t"}),
+    raw_cursor({"ts": {"$gt": ""}, "id": {"$regex": ".*"}}),
+    raw_cursor({"ts": "t", "id": 5}),
+    raw_cursor({"ts": None, "id": "x"}),
+])
+def test_bad_transaction_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        transactions_after(cursor, BRANCHES)
+
+
+@pytest.mark.parametrize("position", [{"bn": True}, {"bn": "3"}, {"bn": 2.5}, {"bn": {"$gt": 0}}, {}])
+def test_bad_block_cursors_are_rejected(position):
+    with pytest.raises(ValueError):
+        blocks_after(raw_cursor(position))
+
+
+def test_tampered_cursor_is_rejected():
+    cursor = transaction_cursor({"timestamp": "t5", "tx_id": "b"})
+    tampered = cursor[:-2] + ("A" if cursor[-2] != "A" else "B") + cursor[-1]
+    with pytest.raises(ValueError):
+        transactions_after(tampered, BRANCHES)
+
+
+def test_endpoints_answer_400_for_bad_cursors():
+    import server
+
+    injected = raw_cursor({"ts": {"$gt": ""}, "id": {"$regex": ".*"}})
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.find_transactions_page(Response(), BRANCHES, injected, 10))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.view_blockchain(Response(), cursor=raw_cursor({"bn": True}), current_user=None))
+    assert error.value.status_code == 400